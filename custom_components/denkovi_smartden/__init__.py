@@ -1,22 +1,81 @@
 """The Denkovi SmartDEN integration."""
 from __future__ import annotations
 
+from functools import partial
 import logging
 from typing import Any
 
+import aiohttp
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-
-from .const import CONF_SCAN_INTERVAL, DEFAULT_PASSWORD, DEFAULT_PORT, DEFAULT_SCAN_INTERVAL, DOMAIN
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .const import (
+    CONF_ACTIVE_WINDOW,
+    CONF_ADAPTIVE_POLLING,
+    CONF_CAPABILITIES,
+    CONF_CAPTURE_TRAFFIC,
+    CONF_FAST_POLL_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_SCAN_INTERVAL,
+    CONNECTOR_LIMIT,
+    CONNECTOR_LIMIT_PER_HOST,
+    DATA_SCHEDULER,
+    DATA_SESSION,
+    DEFAULT_ACTIVE_WINDOW,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_CAPTURE_TRAFFIC,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_PASSWORD,
+    DEFAULT_PORT,
+    DEFAULT_SCAN_INTERVAL,
+    DNS_CACHE_TTL,
+    DOMAIN,
+    STORAGE_VERSION,
+)
+from .capture import DenkoviTrafficCapture
 from .coordinator import DenkoviDataUpdateCoordinator
+from .scheduler import DenkoviPollScheduler
+from .snapshot import DenkoviCapabilities, DenkoviSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SWITCH, Platform.LIGHT, Platform.SENSOR, Platform.BINARY_SENSOR, Platform.NUMBER]
 
 
+@callback
+def _async_acquire_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the shared HTTP session, creating it for the first config entry."""
+    shared = hass.data.get(DATA_SESSION)
+    if shared is None:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTOR_LIMIT,
+            limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+        )
+        shared = hass.data[DATA_SESSION] = {
+            "session": aiohttp.ClientSession(connector=connector),
+            "users": 0,
+        }
+    shared["users"] += 1
+    return shared["session"]
+
+
+async def _async_release_session(hass: HomeAssistant) -> None:
+    """Release the shared HTTP session, closing it after the last config entry."""
+    shared = hass.data[DATA_SESSION]
+    shared["users"] -= 1
+    if shared["users"] == 0:
+        hass.data.pop(DATA_SESSION)
+        await shared["session"].close()
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Denkovi SmartDEN from a config entry."""
     host = entry.data[CONF_HOST]
@@ -24,31 +83,133 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     password = entry.data.get(CONF_PASSWORD, DEFAULT_PASSWORD)
     scan_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
 
-    coordinator = DenkoviDataUpdateCoordinator(hass, host, port, password, scan_interval)
-    
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as err:
-        raise ConfigEntryNotReady(f"Unable to connect to Denkovi SmartDEN at {host}") from err
+    capture = None
+    if entry.options.get(CONF_CAPTURE_TRAFFIC, DEFAULT_CAPTURE_TRAFFIC):
+        capture = DenkoviTrafficCapture(
+            hass, hass.config.path(DOMAIN, f"capture_{host}_{port}.jsonl")
+        )
+
+    coordinator = DenkoviDataUpdateCoordinator(
+        hass,
+        host,
+        port,
+        password,
+        scan_interval,
+        _async_acquire_session(hass),
+        adaptive_polling=entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+        max_scan_interval=entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        active_window=entry.options.get(CONF_ACTIVE_WINDOW, DEFAULT_ACTIVE_WINDOW),
+        fast_poll_interval=entry.options.get(CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL),
+        capture=capture,
+        store=Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"),
+    )
+
+    capabilities = DenkoviCapabilities.from_dict(entry.data.get(CONF_CAPABILITIES))
+    restored = await coordinator.async_restore()
+    connect_in_background = capabilities is not None or restored
+
+    if not connect_in_background:
+        # First setup: the channels are only known once the board answered
+        try:
+            # Keep-alive and concurrency are probed once per board, then stored
+            await coordinator.async_setup_connection()
+            await coordinator.async_config_entry_first_refresh()
+            capabilities = DenkoviCapabilities.from_snapshot(coordinator.data)
+            if capabilities.empty:
+                raise UpdateFailed("No channels found")
+        except Exception as err:
+            await coordinator.async_shutdown()
+            await _async_release_session(hass)
+            raise ConfigEntryNotReady(f"Unable to connect to Denkovi SmartDEN at {host}") from err
+    else:
+        if not restored:
+            # Channels are known but no values, entities are unavailable until the first poll
+            coordinator.data = coordinator.state.restore(DenkoviSnapshot())
+            coordinator.last_update_success = False
+
+    if capabilities is None:
+        capabilities = DenkoviCapabilities.from_snapshot(coordinator.data)
+    if entry.data.get(CONF_CAPABILITIES) != capabilities.as_dict():
+        # Stored before the update listener is registered, so this does not reload
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_CAPABILITIES: capabilities.as_dict()}
+        )
+    coordinator.capabilities = capabilities
+    coordinator.platforms = _platforms(capabilities, entry)
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    # Determine which platforms to load based on device capabilities
-    platforms_to_load = [Platform.SENSOR, Platform.BINARY_SENSOR]
-    
-    # Only add switch, light, and number platforms if device has relays/outputs (IP-Maxi)
-    if coordinator.data.get("relays") or coordinator.data.get("analog_outputs"):
-        platforms_to_load.extend([Platform.SWITCH, Platform.LIGHT, Platform.NUMBER])
+    # Polling is staggered across all boards by the shared scheduler
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = DenkoviPollScheduler(hass)
+    if connect_in_background:
+        # Entities are created without waiting for the board, which is
+        # contacted in the background; entities update once it responds
+        entry.async_create_background_task(
+            hass, _async_connect(hass, entry, coordinator), f"{DOMAIN} connect {host}"
+        )
+    else:
+        hass.data[DATA_SCHEDULER].async_register(coordinator)
+
+    await hass.config_entries.async_forward_entry_setups(entry, coordinator.platforms)
+
+    # Reload with the new channels if the board's layout changed
+    entry.async_on_unload(
+        coordinator.async_add_listener(partial(_async_check_capabilities, hass, entry, coordinator))
+    )
 
-    await hass.config_entries.async_forward_entry_setups(entry, platforms_to_load)
-    
     # Register options update listener
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+def _platforms(capabilities: DenkoviCapabilities, entry: ConfigEntry) -> list[Platform]:
+    """Return the platforms with entities for the board's channels."""
+    platforms = [Platform.SENSOR]
+    if capabilities.digital_inputs:
+        platforms.append(Platform.BINARY_SENSOR)
+    if capabilities.relays:
+        platforms.append(Platform.SWITCH)
+        if entry.options.get("light_relays"):
+            platforms.append(Platform.LIGHT)
+    if capabilities.analog_outputs:
+        platforms.append(Platform.NUMBER)
+    return platforms
+
+
+@callback
+def _async_check_capabilities(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: DenkoviDataUpdateCoordinator
+) -> None:
+    """Store new capabilities, which reloads the entry, when the channel layout changed."""
+    # The layout can only have changed if the whole snapshot is marked as changed
+    if coordinator.changed_channels is not None or not coordinator.last_update_success:
+        return
+    capabilities = DenkoviCapabilities.from_snapshot(coordinator.data)
+    if capabilities == coordinator.capabilities or capabilities.empty:
+        return
+    _LOGGER.info("Channel layout of %s changed, reloading", coordinator.host)
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_CAPABILITIES: capabilities.as_dict()}
+    )
+
+
+async def _async_connect(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: DenkoviDataUpdateCoordinator
+) -> None:
+    """Set up the connection to a board whose entities were created before polling it."""
+    scheduler: DenkoviPollScheduler = hass.data[DATA_SCHEDULER]
+    # The probe measures the board on its own, polling starts once it is done
+    await scheduler.async_setup_connection(coordinator)
+    if hass.data[DOMAIN].get(entry.entry_id) is not coordinator:
+        # Unloaded while probing
+        return
+    # The first poll runs at the board's phase, like every later one
+    scheduler.async_register(coordinator)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload the config entry when options change."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -56,15 +217,17 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # Determine which platforms were loaded
+    # Exactly the platforms set up, independent of the current data
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    platforms_to_unload = [Platform.SENSOR, Platform.BINARY_SENSOR]
-    
-    if coordinator.data.get("relays") or coordinator.data.get("analog_outputs"):
-        platforms_to_unload.extend([Platform.SWITCH, Platform.LIGHT, Platform.NUMBER])
-    
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, platforms_to_unload):
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, coordinator.platforms):
         coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DATA_SCHEDULER].async_unregister(coordinator)
         await coordinator.async_shutdown()
+        await _async_release_session(hass)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored state of a deleted config entry."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
@@ -7,11 +7,11 @@ from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN
 from .coordinator import DenkoviDataUpdateCoordinator
+from .entity import DenkoviEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,15 +26,13 @@ async def async_setup_entry(
 
     # Create binary sensor entities for each digital input
     entities = []
-    digital_inputs = coordinator.data.get("digital_inputs", {})
-    
-    for input_id in digital_inputs:
+    for input_id in coordinator.capabilities.digital_input_ids:
         entities.append(DenkoviBinarySensor(coordinator, entry, input_id))
 
     async_add_entities(entities)
 
 
-class DenkoviBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class DenkoviBinarySensor(DenkoviEntity, BinarySensorEntity):
     """Representation of a Denkovi SmartDEN digital input."""
 
     def __init__(
@@ -46,8 +44,9 @@ class DenkoviBinarySensor(CoordinatorEntity, BinarySensorEntity):
         """Initialize the binary sensor."""
         super().__init__(coordinator)
         self._input_id = input_id
+        self._channel = ("digital_inputs", input_id)
         # Use name from API, fallback to generic name
-        input_name = coordinator.data.get("digital_input_names", {}).get(input_id, f"Digital Input {input_id}")
+        input_name = coordinator.metadata.digital_input_name(input_id, f"Digital Input {input_id}")
         self._attr_name = input_name
         self._attr_unique_id = f"{entry.entry_id}_digital_input_{input_id}"
         self._attr_device_info = DeviceInfo(
@@ -60,4 +59,4 @@ class DenkoviBinarySensor(CoordinatorEntity, BinarySensorEntity):
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
-        return self.coordinator.data.get("digital_inputs", {}).get(self._input_id, False)
+        return self.coordinator.data.digital_input(self._input_id)
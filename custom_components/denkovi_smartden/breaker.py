@@ -0,0 +1,40 @@
+"""Circuit breaker for unreachable Denkovi SmartDEN boards."""
+from __future__ import annotations
+
+
+class CircuitBreaker:
+    """Track consecutive failures of one board and space out probes while it is down.
+
+    The breaker opens after threshold consecutive failed requests. While open,
+    the board is only probed, at an interval that doubles after every failed
+    probe up to max_interval. The first successful request closes it again.
+    """
+
+    def __init__(self, threshold: int, probe_interval: float, max_interval: float) -> None:
+        """Initialize the breaker."""
+        self._threshold = threshold
+        self._probe_interval = probe_interval
+        self._max_interval = max_interval
+        self.failures = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while the board is considered unreachable."""
+        return self.failures >= self._threshold
+
+    @property
+    def probe_interval(self) -> float:
+        """Return the seconds until the next probe of an open breaker."""
+        failed_probes = max(self.failures - self._threshold, 0)
+        return float(min(self._probe_interval * 2**failed_probes, self._max_interval))
+
+    def record_success(self) -> bool:
+        """Record a successful request, return True if this closed the breaker."""
+        was_open = self.is_open
+        self.failures = 0
+        return was_open
+
+    def record_failure(self) -> bool:
+        """Record a failed request, return True if this opened the breaker."""
+        self.failures += 1
+        return self.failures == self._threshold
@@ -0,0 +1,100 @@
+"""Traffic capture for Denkovi SmartDEN, replayed by tools/replay.py."""
+from __future__ import annotations
+
+import asyncio
+import os
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_bytes
+
+from .const import CAPTURE_BACKUPS, CAPTURE_MAX_BYTES, DOMAIN
+
+
+class DenkoviTrafficCapture:
+    """Append every request/response pair of one board to a rotating file.
+
+    Each line is a JSON object with the wall clock time the request was sent,
+    its duration, the request path and query (without the password), the
+    HTTP status, the response body and the error, if any. Records are
+    buffered in memory and written in batches from the executor.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        """Initialize the capture."""
+        self.hass = hass
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._buffer: list[bytes] = []
+        self._write_task: asyncio.Task[None] | None = None
+
+    @callback
+    def async_record(
+        self,
+        requested_at: float,
+        duration: float,
+        request: str,
+        status: int | None,
+        body: bytes | None,
+        error: str | None = None,
+    ) -> None:
+        """Queue one request/response pair for writing."""
+        record = {
+            "ts": round(requested_at, 6),
+            "dur": round(duration, 6),
+            "req": request,
+            "status": status,
+            "body": None if body is None else body.decode(errors="replace"),
+        }
+        if error is not None:
+            record["error"] = error
+        self._buffer.append(json_bytes(record) + b"\n")
+        if self._write_task is None:
+            self._write_task = self.hass.async_create_background_task(
+                self._async_write(), f"{DOMAIN} capture {self.path}"
+            )
+
+    async def _async_write(self) -> None:
+        """Write buffered records until the buffer is empty."""
+        try:
+            while self._buffer:
+                lines, self._buffer = self._buffer, []
+                await self.hass.async_add_executor_job(self._write, lines)
+        finally:
+            self._write_task = None
+
+    def _write(self, lines: list[bytes]) -> None:
+        """Append lines to the capture file, rotating it when full."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size and size + sum(map(len, lines)) > self._max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as file:
+            file.writelines(lines)
+
+    def _rotate(self) -> None:
+        """Shift capture.jsonl to capture.jsonl.1 and so on, dropping the oldest."""
+        for idx in range(self._backups - 1, 0, -1):
+            source = f"{self.path}.{idx}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{idx + 1}")
+        if self._backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    async def async_close(self) -> None:
+        """Write out everything recorded so far."""
+        if self._write_task is not None:
+            await self._write_task
+        if self._buffer:
+            await self._async_write()
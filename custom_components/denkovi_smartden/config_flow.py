@@ -7,6 +7,8 @@ from typing import Any
 import aiohttp
 import voluptuous as vol
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.json import json_loads
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT
@@ -14,7 +16,25 @@ from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import CONF_SCAN_INTERVAL, DEFAULT_PASSWORD, DEFAULT_PORT, DEFAULT_SCAN_INTERVAL, DOMAIN
+from .const import (
+    CONF_ACTIVE_WINDOW,
+    CONF_ADAPTIVE_POLLING,
+    CONF_CAPTURE_TRAFFIC,
+    CONF_FAST_POLL_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_SCAN_INTERVAL,
+    CONNECT_TIMEOUT,
+    DEFAULT_ACTIVE_WINDOW,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_CAPTURE_TRAFFIC,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_PASSWORD,
+    DEFAULT_PORT,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    REQUEST_TIMEOUT,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,16 +59,23 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     # Test connection to the device
     url = f"http://{host}:{port}/current_state.json?pw={password}"
     
+    # One-off probe, use Home Assistant's shared session instead of a new one
+    session = async_get_clientsession(hass)
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status != 200:
-                    raise CannotConnect
-                
-                # Validate JSON response
-                data_json = await response.json()
-                if "CurrentState" not in data_json:
-                    raise CannotConnect
+        # Nothing measured yet, a board that does not accept the connection
+        # quickly is reported as unreachable without waiting for the full timeout
+        timeout = aiohttp.ClientTimeout(
+            total=REQUEST_TIMEOUT, sock_connect=CONNECT_TIMEOUT, sock_read=REQUEST_TIMEOUT
+        )
+        async with session.get(url, timeout=timeout) as response:
+            if response.status != 200:
+                raise CannotConnect
+
+            # Validate JSON response
+            data_json = json_loads(await response.read())
+            if not isinstance(data_json, dict) or "CurrentState" not in data_json:
+                raise CannotConnect
     except aiohttp.ClientError as err:
         _LOGGER.error("Error connecting to Denkovi SmartDEN: %s", err)
         raise CannotConnect from err
@@ -110,6 +137,11 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         # Get current configuration
         current_light_relays = self.config_entry.options.get("light_relays", [])
         current_scan_interval = self.config_entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+        current_adaptive_polling = self.config_entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+        current_max_scan_interval = self.config_entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)
+        current_active_window = self.config_entry.options.get(CONF_ACTIVE_WINDOW, DEFAULT_ACTIVE_WINDOW)
+        current_fast_poll_interval = self.config_entry.options.get(CONF_FAST_POLL_INTERVAL, DEFAULT_FAST_POLL_INTERVAL)
+        current_capture_traffic = self.config_entry.options.get(CONF_CAPTURE_TRAFFIC, DEFAULT_CAPTURE_TRAFFIC)
 
         # Create options schema
         options_schema = vol.Schema(
@@ -132,6 +164,26 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     default=current_scan_interval,
                     description={"suggested_value": current_scan_interval},
                 ): vol.All(vol.Coerce(int), vol.Range(min=5, max=60)),
+                vol.Optional(
+                    CONF_ADAPTIVE_POLLING,
+                    default=current_adaptive_polling,
+                ): bool,
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=current_max_scan_interval,
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=600)),
+                vol.Optional(
+                    CONF_ACTIVE_WINDOW,
+                    default=current_active_window,
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_FAST_POLL_INTERVAL,
+                    default=current_fast_poll_interval,
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=5000)),
+                vol.Optional(
+                    CONF_CAPTURE_TRAFFIC,
+                    default=current_capture_traffic,
+                ): bool,
             }
         )
 
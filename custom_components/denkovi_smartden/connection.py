@@ -0,0 +1,160 @@
+"""Connection profiling for Denkovi SmartDEN boards."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass
+import logging
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from .const import CONNECTOR_LIMIT_PER_HOST, PROBE_PARALLEL_FACTOR, PROBE_REQUESTS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ConnectionProfile:
+    """How a board's web server handles connections.
+
+    keep_alive is False for firmware that closes or drops idle connections;
+    requests then ask for the connection to be closed instead of pooling it.
+    max_concurrent is 1 for boards that serve requests one at a time.
+    """
+
+    keep_alive: bool = True
+    max_concurrent: int = CONNECTOR_LIMIT_PER_HOST
+    # Seconds for a request on a new connection and on a reused one
+    fresh_rtt: float | None = None
+    reused_rtt: float | None = None
+    # Seconds spent establishing a new connection
+    connect_time: float | None = None
+    # Wall clock time of the probe, None for the defaults
+    probed_at: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile for storage."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> ConnectionProfile | None:
+        """Return a stored profile, or None if there is none or it is unreadable."""
+        if not data:
+            return None
+        try:
+            return cls(**data)
+        except TypeError:
+            return None
+
+
+@dataclass(slots=True)
+class _RequestTrace:
+    """Connection events of one traced request."""
+
+    reused: bool = False
+    connect_started: float | None = None
+    connect_time: float | None = None
+
+
+async def _on_connection_create_start(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    """Note when a new connection is being opened."""
+    context.trace_request_ctx.connect_started = time.monotonic()
+
+
+async def _on_connection_create_end(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    """Note how long opening the new connection took."""
+    trace: _RequestTrace = context.trace_request_ctx
+    if trace.connect_started is not None:
+        trace.connect_time = time.monotonic() - trace.connect_started
+
+
+async def _on_connection_reuseconn(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    """Note that a pooled connection was reused."""
+    context.trace_request_ctx.reused = True
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    """Return a trace config that records connection reuse and connect time."""
+    trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    return trace_config
+
+
+async def _async_timed_get(
+    session: aiohttp.ClientSession,
+    url: str,
+    timeout: aiohttp.ClientTimeout,
+    headers: dict[str, str] | None = None,
+) -> tuple[float, _RequestTrace]:
+    """Send one request and return its duration and connection events."""
+    trace = _RequestTrace()
+    started = time.monotonic()
+    async with session.get(
+        url, timeout=timeout, headers=headers, trace_request_ctx=trace
+    ) as response:
+        response.raise_for_status()
+        await response.read()
+    return time.monotonic() - started, trace
+
+
+async def async_probe_connection(url: str, timeout: aiohttp.ClientTimeout) -> ConnectionProfile:
+    """Work out whether a board keeps connections alive and serves requests in parallel.
+
+    Uses a private session, so pooled connections of the shared session do not
+    affect the result. Raises aiohttp.ClientError or asyncio.TimeoutError if the
+    board does not respond.
+    """
+    profile = ConnectionProfile(probed_at=time.time())
+    connector = aiohttp.TCPConnector(limit_per_host=CONNECTOR_LIMIT_PER_HOST)
+    async with aiohttp.ClientSession(connector=connector, trace_configs=[_trace_config()]) as session:
+        # Sequential requests: all but the first reuse the connection if the
+        # server honors keep-alive
+        fresh: list[float] = []
+        reused: list[float] = []
+        connect_times: list[float] = []
+        for _ in range(PROBE_REQUESTS):
+            try:
+                rtt, trace = await _async_timed_get(session, url, timeout)
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError):
+                # The board dropped a connection it had left open
+                profile.keep_alive = False
+                continue
+            (reused if trace.reused else fresh).append(rtt)
+            if trace.connect_time is not None:
+                connect_times.append(trace.connect_time)
+        if not reused:
+            profile.keep_alive = False
+        if not fresh and not reused:
+            raise aiohttp.ClientError("No successful probe request")
+
+        profile.fresh_rtt = min(fresh) if fresh else None
+        profile.reused_rtt = min(reused) if reused else None
+        profile.connect_time = min(connect_times) if connect_times else None
+
+        # Two requests at once on separate connections: a board that queues
+        # them takes about twice as long as for one
+        single = min(fresh or reused)
+        headers = {"Connection": "close"}
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(_async_timed_get(session, url, timeout, headers) for _ in range(2)),
+            return_exceptions=True,
+        )
+        elapsed = time.monotonic() - started
+        if any(isinstance(result, BaseException) for result in results):
+            profile.max_concurrent = 1
+        else:
+            profile.max_concurrent = 2 if elapsed < single * PROBE_PARALLEL_FACTOR else 1
+
+    _LOGGER.debug("Connection profile for %s: %s", url.split("?", 1)[0], profile)
+    return profile
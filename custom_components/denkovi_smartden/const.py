@@ -6,3 +6,85 @@ DEFAULT_PORT = 80
 DEFAULT_SCAN_INTERVAL = 10
 DEFAULT_PASSWORD = "admin"
 CONF_SCAN_INTERVAL = "scan_interval"
+# Channel counts discovered from the board, kept in the config entry data
+CONF_CAPABILITIES = "capabilities"
+
+# hass.data key for the HTTP session shared by all config entries
+DATA_SESSION = f"{DOMAIN}_session"
+# SmartDEN boards run a small single-threaded web server, keep per-host
+# concurrency low so requests queue in the connector rather than on the board
+CONNECTOR_LIMIT = 100
+CONNECTOR_LIMIT_PER_HOST = 2
+DNS_CACHE_TTL = 300
+
+# hass.data key for the poll scheduler shared by all config entries
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+# Maximum number of boards polled at the same time
+FLEET_MAX_CONCURRENT_POLLS = 8
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_ACTIVE_WINDOW = "active_window"
+
+# Adaptive polling: back off while idle, poll at scan_interval after activity
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_MAX_SCAN_INTERVAL = 60
+DEFAULT_ACTIVE_WINDOW = 60
+IDLE_BACKOFF_FACTOR = 1.5
+
+# Fast input polling: interval in milliseconds, 0 disables it
+CONF_FAST_POLL_INTERVAL = "fast_poll_interval"
+DEFAULT_FAST_POLL_INTERVAL = 0
+FAST_POLL_MIN_INTERVAL = 100
+# Never poll faster than this multiple of the device response time
+FAST_POLL_RTT_FACTOR = 2.0
+
+# Number of recent polls kept for poll rate, latency and success statistics
+POLL_STATS_WINDOW = 100
+
+# Raw payloads and write requests kept for the diagnostics download; payloads
+# are truncated so the buffers stay small even with many boards
+DIAGNOSTICS_HISTORY = 10
+DIAGNOSTICS_MAX_PAYLOAD = 16384
+
+# Traffic capture for replay: one rotating JSON lines file per board under
+# <config>/denkovi_smartden/
+CONF_CAPTURE_TRAFFIC = "capture_traffic"
+DEFAULT_CAPTURE_TRAFFIC = False
+CAPTURE_MAX_BYTES = 5 * 1024 * 1024
+CAPTURE_BACKUPS = 2
+
+# Seconds between re-reading channel names and device info from a poll
+METADATA_REFRESH_INTERVAL = 300
+
+# Timeouts for poll and write requests. Until enough polls were measured, and
+# after a request timed out, the defaults apply; otherwise the connect and
+# read timeouts are TIMEOUT_RTT_FACTOR times the p99 round-trip time, clamped
+# between the minimum and the default. REQUEST_TIMEOUT always caps the total.
+REQUEST_TIMEOUT = 10
+CONNECT_TIMEOUT = 5
+CONNECT_TIMEOUT_MIN = 0.5
+READ_TIMEOUT_MIN = 0.5
+TIMEOUT_RTT_FACTOR = 4
+TIMEOUT_MIN_SAMPLES = 10
+
+# Storage of per-board state that survives restarts; the last snapshot is
+# written at most every SNAPSHOT_SAVE_DELAY seconds and on shutdown
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+# Connection profiling: number of sequential probe requests, and how much
+# longer than one request two parallel requests may take to count as served
+# in parallel. Profiles are re-probed after CONNECTION_PROFILE_MAX_AGE seconds.
+PROBE_REQUESTS = 4
+PROBE_PARALLEL_FACTOR = 1.5
+CONNECTION_PROFILE_MAX_AGE = 7 * 24 * 3600
+
+# Circuit breaker: after this many consecutive failed requests the board is
+# only probed, with a short timeout, at an interval doubling up to the maximum
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_PROBE_INTERVAL = 10
+BREAKER_MAX_PROBE_INTERVAL = 300
+BREAKER_PROBE_TIMEOUT = 2
+
+# Window in which relay/analog output writes are merged into one request
+WRITE_COALESCE_DELAY = 0.05
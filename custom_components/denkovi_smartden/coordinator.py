@@ -1,21 +1,71 @@
 """Data update coordinator for Denkovi SmartDEN."""
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+from collections import deque
+from datetime import datetime
 import logging
+import time
 from typing import Any
 
 import aiohttp
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
 
-from .const import DOMAIN
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_PROBE_INTERVAL,
+    BREAKER_PROBE_INTERVAL,
+    BREAKER_PROBE_TIMEOUT,
+    CONNECT_TIMEOUT,
+    CONNECT_TIMEOUT_MIN,
+    CONNECTION_PROFILE_MAX_AGE,
+    DEFAULT_ACTIVE_WINDOW,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_FAST_POLL_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DIAGNOSTICS_HISTORY,
+    DIAGNOSTICS_MAX_PAYLOAD,
+    DOMAIN,
+    FAST_POLL_MIN_INTERVAL,
+    FAST_POLL_RTT_FACTOR,
+    IDLE_BACKOFF_FACTOR,
+    METADATA_REFRESH_INTERVAL,
+    POLL_STATS_WINDOW,
+    READ_TIMEOUT_MIN,
+    REQUEST_TIMEOUT,
+    SNAPSHOT_SAVE_DELAY,
+    TIMEOUT_MIN_SAMPLES,
+    TIMEOUT_RTT_FACTOR,
+    WRITE_COALESCE_DELAY,
+)
+from .breaker import CircuitBreaker
+from .capture import DenkoviTrafficCapture
+from .connection import ConnectionProfile, async_probe_connection
+from .request_queue import PRIORITY_POLL, PRIORITY_WRITE, RequestQueue
+from .state_store import DenkoviStateStore
+from .snapshot import (
+    DenkoviCapabilities,
+    DenkoviMetadata,
+    DenkoviSnapshot,
+    parse_metadata,
+    parse_snapshot,
+)
+from .stats import PayloadRecord, PollStats, WriteRecord
 
 _LOGGER = logging.getLogger(__name__)
 
+# Query parameter prefix that writes each writable channel type
+WRITE_PARAMS = {"relays": "Relay", "analog_outputs": "AnalogOutput"}
 
-class DenkoviDataUpdateCoordinator(DataUpdateCoordinator):
+
+class DenkoviDataUpdateCoordinator(DataUpdateCoordinator[DenkoviSnapshot]):
     """Class to manage fetching Denkovi SmartDEN data."""
 
     def __init__(
@@ -25,212 +75,623 @@ class DenkoviDataUpdateCoordinator(DataUpdateCoordinator):
         port: int,
         password: str,
         scan_interval: int,
+        session: aiohttp.ClientSession,
+        adaptive_polling: bool = DEFAULT_ADAPTIVE_POLLING,
+        max_scan_interval: int = DEFAULT_MAX_SCAN_INTERVAL,
+        active_window: int = DEFAULT_ACTIVE_WINDOW,
+        fast_poll_interval: int = DEFAULT_FAST_POLL_INTERVAL,
+        capture: DenkoviTrafficCapture | None = None,
+        store: Store[dict[str, Any]] | None = None,
     ) -> None:
         """Initialize."""
         self.host = host
         self.port = port
         self.password = password
-        
-        # Create persistent session with connection pooling
-        connector = aiohttp.TCPConnector(
-            limit=10,
-            limit_per_host=5,
-            ttl_dns_cache=300,
-            enable_cleanup_closed=True,
+
+        # Polling is driven by the domain-wide DenkoviPollScheduler, which reads
+        # poll_interval after every poll. Adaptive polling stretches it while
+        # nothing changes.
+        self._scan_interval = scan_interval
+        self._poll_interval = float(scan_interval)
+        self.schedule_slip: float | None = None
+        self._adaptive_polling = adaptive_polling
+        self._max_scan_interval = max(max_scan_interval, scan_interval)
+        self._active_window = active_window
+        self._active_until = 0.0
+
+        # Fast input polling replaces scan_interval with a sub-second interval
+        self._fast_poll_interval = (
+            max(fast_poll_interval, FAST_POLL_MIN_INTERVAL) / 1000 if fast_poll_interval else None
+        )
+
+        # Single-flight poll shared by scheduled polls and refresh requests
+        self._poll_task: asyncio.Task[DenkoviSnapshot] | None = None
+
+        # Stops regular polling and fails writes fast while the board is down
+        self.breaker = CircuitBreaker(
+            BREAKER_FAILURE_THRESHOLD, BREAKER_PROBE_INTERVAL, BREAKER_MAX_PROBE_INTERVAL
         )
-        self._session = aiohttp.ClientSession(connector=connector)
+
+        # Connect/read timeouts tuned from the measured round-trip times; the
+        # defaults are used again for the request after a timeout
+        self.timeout = self._default_timeout = aiohttp.ClientTimeout(
+            total=REQUEST_TIMEOUT, sock_connect=CONNECT_TIMEOUT, sock_read=REQUEST_TIMEOUT
+        )
+        self._timed_out = False
+
+        # Latency, size and success of recent polls for the diagnostic sensors
+        self.stats = PollStats(POLL_STATS_WINDOW)
+
+        # Raw traffic for the diagnostics download
+        self.recent_payloads: deque[PayloadRecord] = deque(maxlen=DIAGNOSTICS_HISTORY)
+        self.recent_writes: deque[WriteRecord] = deque(maxlen=DIAGNOSTICS_HISTORY)
+
+        # Optional full traffic capture for offline replay
+        self.capture = capture
+
+        # Session shared by all config entries, owned by __init__.py
+        self._session = session
+
+        # Last snapshot, names and connection profile, kept across restarts
+        self._store = store
+        self._stored: dict[str, Any] = {}
+        self._save_scheduled = False
+
+        # Keep-alive and concurrency the board supports, probed once and stored
+        self.connection_profile = ConnectionProfile()
+
+        # All requests to the board go through one queue, writes before polls
+        self.requests = RequestQueue(self.connection_profile.max_concurrent, POLL_STATS_WINDOW)
+        self._request_headers: dict[str, str] | None = None
+
+        # Pending writes per channel (e.g. ("relays", 3): 1), sent by one writer
+        # task with at most one request in flight. A newer value for a channel
+        # replaces a queued one; its waiters wait for the newest value.
+        self._pending_writes: dict[tuple[str, int], int] = {}
+        self._pending_waiters: dict[tuple[str, int], list[asyncio.Future[None]]] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+
+        # Last state reported by the device with the values still being written
+        # on top; the coordinator data is its view. Writes of values the device
+        # already reported are skipped.
+        self.state = DenkoviStateStore()
+        self._state_listeners: list[CALLBACK_TYPE] = []
+        self.skipped_polls = 0
+        self.skipped_writes = 0
+
+        # Channel counts stored with the config entry and the platforms set up
+        # for them, set by __init__.py
+        self.capabilities: DenkoviCapabilities | None = None
+        self.platforms: list[Platform] = []
+
+        # Channel names and device info, held apart from the per-poll values and
+        # only re-read every METADATA_REFRESH_INTERVAL or when the layout changes
+        self.metadata = DenkoviMetadata()
+        self._metadata_refreshed: float | None = None
+
+        # Snapshot last dispatched to listeners and the channels that changed in it
+        self._dispatched_data: DenkoviSnapshot | None = None
+        self.changed_channels: set[tuple[str, int]] | None = None
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=scan_interval),
+            # The scheduler owns the timer
+            update_interval=None,
         )
 
+    @property
+    def fast_polling(self) -> bool:
+        """Return True if fast input polling is enabled."""
+        return self._fast_poll_interval is not None
+
+    @property
+    def poll_interval(self) -> float:
+        """Return the seconds between the starts of two scheduled polls."""
+        if self.breaker.is_open:
+            return self.breaker.probe_interval
+        if self._fast_poll_interval is None:
+            return self._poll_interval
+        # Never poll faster than the device can answer
+        if self.stats.last_rtt is None:
+            return self._fast_poll_interval
+        return max(self._fast_poll_interval, self.stats.last_rtt * FAST_POLL_RTT_FACTOR)
+
+    @property
+    def request_timeout(self) -> aiohttp.ClientTimeout:
+        """Return the timeout for the next request, short while probing a dead board."""
+        if self.breaker.is_open:
+            return aiohttp.ClientTimeout(total=BREAKER_PROBE_TIMEOUT)
+        if self._timed_out:
+            return self._default_timeout
+        return self.timeout
+
+    async def async_restore(self) -> bool:
+        """Load the stored state, return True if a cached snapshot was restored.
+
+        The restored snapshot becomes the coordinator data until the first
+        poll, so entities can be created without waiting for the board.
+        """
+        if self._store is None:
+            return False
+        self._stored = await self._store.async_load() or {}
+        try:
+            snapshot = DenkoviSnapshot.from_dict(self._stored["snapshot"])
+            metadata = DenkoviMetadata.from_dict(self._stored["metadata"])
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return False
+        self.data = self.state.restore(snapshot)
+        self.metadata = metadata
+        return True
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Store the confirmed snapshot, batching saves over SNAPSHOT_SAVE_DELAY."""
+        if self._store is None or self._save_scheduled:
+            return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._data_to_store, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the data to store, called when the delayed save runs."""
+        self._save_scheduled = False
+        if self.state.base is not None:
+            self._stored["snapshot"] = self.state.base.as_dict()
+            self._stored["metadata"] = self.metadata.as_dict()
+        return self._stored
+
+    async def async_setup_connection(self) -> None:
+        """Load the board's connection profile, probing the board if none is stored."""
+        profile = ConnectionProfile.from_dict(self._stored.get("connection"))
+
+        if (
+            profile is None
+            or profile.probed_at is None
+            or time.time() - profile.probed_at > CONNECTION_PROFILE_MAX_AGE
+        ):
+            url = f"http://{self.host}:{self.port}/current_state.json?pw={self.password}"
+            try:
+                # Nothing else may reach the board while it is being measured
+                async with self.requests.exclusive(PRIORITY_POLL):
+                    profile = await async_probe_connection(url, self._default_timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                # Probed again on the next start
+                _LOGGER.debug(
+                    "Could not probe %s, using default connection settings: %s", self.host, err
+                )
+                return
+            self._stored["connection"] = profile.as_dict()
+            if self._store is not None:
+                # Replaces any delayed save, so go through the same callback
+                await self._store.async_save(self._data_to_store())
+
+        self.connection_profile = profile
+        self.requests.max_concurrent = profile.max_concurrent
+        self._request_headers = None if profile.keep_alive else {"Connection": "close"}
+
     def get_device_model(self) -> str:
         """Determine device model based on capabilities."""
-        # Notifier has temperature inputs, no relays/outputs
-        if self.data.get("temperature_inputs") and not self.data.get("relays"):
-            return "SmartDEN Notifier"
-        # IP-Maxi has relays and analog outputs
-        elif self.data.get("relays") or self.data.get("analog_outputs"):
-            return "SmartDEN IP-Maxi"
-        # Default fallback
-        return "SmartDEN"
-
-    async def _async_update_data(self) -> dict[str, Any]:
+        capabilities = self.capabilities or DenkoviCapabilities.from_snapshot(self.data)
+        return capabilities.model
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Work out which channels changed, then update listeners."""
+        self.changed_channels = self._diff_channels(self._dispatched_data, self.data)
+        self._dispatched_data = self.data
+        super().async_update_listeners()
+
+    def channel_changed(self, channel: tuple[str, int] | None) -> bool:
+        """Return True if the channel changed in the last dispatched update."""
+        return self.changed_channels is None or channel is None or channel in self.changed_channels
+
+    @staticmethod
+    def _diff_channels(
+        old: DenkoviSnapshot | None, new: DenkoviSnapshot | None
+    ) -> set[tuple[str, int]] | None:
+        """Return the channels whose value differs between two snapshots.
+
+        None means everything must be treated as changed.
+        """
+        if old is None or new is None:
+            return None
+        if old is new:
+            return set()
+        return new.changed_channels(old)
+
+    async def _async_update_data(self) -> DenkoviSnapshot:
         """Fetch data from Denkovi SmartDEN."""
+        snapshot = await self._async_fetch_snapshot()
+        self._adapt_poll_interval(
+            self.data is None or self._diff_channels(self.data, snapshot) != set()
+        )
+        return snapshot
+
+    async def _async_fetch_snapshot(self) -> DenkoviSnapshot:
+        """Poll the device, joining a poll that is already in flight."""
+        if self._poll_task is None:
+            self._poll_task = self.hass.async_create_task(self._async_poll_device())
+            self._poll_task.add_done_callback(self._poll_done)
+        return await asyncio.shield(self._poll_task)
+
+    @callback
+    def _poll_done(self, task: asyncio.Task[DenkoviSnapshot]) -> None:
+        """Allow the next poll to start."""
+        if self._poll_task is task:
+            self._poll_task = None
+        # Callers may have been cancelled; mark the exception as retrieved
+        if not task.cancelled():
+            task.exception()
+
+    async def _async_poll_device(self) -> DenkoviSnapshot:
+        """Poll the device once the request queue has a slot for it."""
+        queued = time.monotonic()
+        async with self.requests.slot(PRIORITY_POLL):
+            confirmed_at = self.state.confirmed_at
+            if confirmed_at is not None and confirmed_at > queued:
+                # A write response delivered the full state while this poll waited
+                self.skipped_polls += 1
+                return self.state.view
+            return await self._async_request_state()
+
+    async def _async_request_state(self) -> DenkoviSnapshot:
+        """Fetch and parse the current state, recording poll statistics."""
         url = f"http://{self.host}:{self.port}/current_state.json?pw={self.password}"
+        requested_at = dt_util.utcnow()
+        started = time.monotonic()
+        status: int | None = None
+        body: bytes | None = None
+        request = self.state.begin_request()
 
         try:
             async with self._session.get(
-                url, timeout=aiohttp.ClientTimeout(total=10)
+                url, timeout=self.request_timeout, headers=self._request_headers
             ) as response:
+                status = response.status
                 if response.status != 200:
+                    body = await response.read()
                     raise UpdateFailed(f"Error fetching data: HTTP {response.status}")
 
-                json_data = await response.json()
-                return self._parse_json(json_data)
+                body = await response.read()
+            json_data = self._decode_json(body)
 
         except aiohttp.ClientError as err:
+            self._record_poll_failure(requested_at, started, err, status, body)
             raise UpdateFailed(f"Error communicating with device: {err}") from err
+        except (UpdateFailed, asyncio.TimeoutError) as err:
+            self._record_poll_failure(requested_at, started, err, status, body)
+            raise
+
+        rtt = time.monotonic() - started
+        self._capture_traffic(requested_at, rtt, "", status, body)
+        self._record_request_success()
+        self.recent_payloads.append(
+            PayloadRecord(requested_at, rtt, body=body[:DIAGNOSTICS_MAX_PAYLOAD])
+        )
+        parse_started = time.perf_counter()
+        snapshot = self._parse_json(json_data, request)
+        self.stats.record_success(rtt, len(body), time.perf_counter() - parse_started)
+        self._tune_timeout()
+        return snapshot
+
+    def _record_poll_failure(
+        self,
+        requested_at: datetime,
+        started: float,
+        err: Exception,
+        status: int | None,
+        body: bytes | None,
+    ) -> None:
+        """Record a failed poll in the statistics and the diagnostics trace."""
+        elapsed = time.monotonic() - started
+        error = str(err) or type(err).__name__
+        self.stats.record_failure(elapsed)
+        self.recent_payloads.append(PayloadRecord(requested_at, elapsed, error=error))
+        self._capture_traffic(requested_at, elapsed, "", status, body, error)
+        self._record_request_failure(err)
+
+    @callback
+    def _record_request_success(self) -> None:
+        """Close the circuit breaker and return to the tuned timeout after a good response."""
+        self._timed_out = False
+        if self.breaker.record_success():
+            _LOGGER.info("Denkovi SmartDEN at %s is reachable again", self.host)
+
+    @callback
+    def _record_request_failure(self, err: Exception) -> None:
+        """Count a failed request towards opening the circuit breaker."""
+        # A board that became slower gets the default timeout until the
+        # slower round-trip times have been measured
+        self._timed_out = isinstance(err, asyncio.TimeoutError)
+        if self.breaker.record_failure():
+            _LOGGER.warning(
+                "Denkovi SmartDEN at %s failed %s requests in a row, "
+                "probing every %s-%s seconds until it responds",
+                self.host,
+                BREAKER_FAILURE_THRESHOLD,
+                BREAKER_PROBE_INTERVAL,
+                BREAKER_MAX_PROBE_INTERVAL,
+            )
+
+    @callback
+    def _capture_traffic(
+        self,
+        requested_at: datetime,
+        duration: float,
+        params: str,
+        status: int | None,
+        body: bytes | None,
+        error: str | None = None,
+    ) -> None:
+        """Append a request/response pair to the traffic capture, if enabled."""
+        if self.capture is None:
+            return
+        request = f"/current_state.json?{params}" if params else "/current_state.json"
+        self.capture.async_record(
+            requested_at.timestamp(), duration, request, status, body, error
+        )
+
+    @callback
+    def _tune_timeout(self) -> None:
+        """Derive the connect and read timeouts from the p99 round-trip time."""
+        if self.stats.successes < TIMEOUT_MIN_SAMPLES:
+            return
+        limit = self.stats.rtt_percentile(99) * TIMEOUT_RTT_FACTOR
+        self.timeout = aiohttp.ClientTimeout(
+            total=REQUEST_TIMEOUT,
+            sock_connect=min(max(limit, CONNECT_TIMEOUT_MIN), CONNECT_TIMEOUT),
+            sock_read=min(max(limit, READ_TIMEOUT_MIN), REQUEST_TIMEOUT),
+        )
+
+    @staticmethod
+    def _decode_json(body: bytes) -> dict[str, Any]:
+        """Decode the raw response body, whatever content type the board sends."""
+        try:
+            json_data = json_loads(body)
+        except ValueError as err:
+            raise UpdateFailed(f"Invalid JSON from device: {err}") from err
+        if not isinstance(json_data, dict):
+            raise UpdateFailed("Unexpected response from device")
+        return json_data
+
+    @callback
+    def _mark_activity(self) -> None:
+        """Poll at the base rate for the active window after a write."""
+        self._adapt_poll_interval(True)
+
+    @callback
+    def _adapt_poll_interval(self, active: bool) -> None:
+        """Back off the poll interval while idle, snap back after activity."""
+        if not self._adaptive_polling or self.fast_polling:
+            return
+
+        now = time.monotonic()
+        if active:
+            self._active_until = now + self._active_window
+
+        if now < self._active_until:
+            interval = self._scan_interval
+        else:
+            interval = min(self._poll_interval * IDLE_BACKOFF_FACTOR, self._max_scan_interval)
+
+        if interval != self._poll_interval:
+            _LOGGER.debug("Polling %s every %.1f seconds", self.host, interval)
+            self._poll_interval = interval
 
-    def _parse_json(self, json_data: dict[str, Any]) -> dict[str, Any]:
-        """Parse JSON response from device."""
+    @callback
+    def async_add_state_listener(self, state_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for full device state responses, from polls and writes alike."""
+        self._state_listeners.append(state_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._state_listeners.remove(state_callback)
+
+        return remove_listener
+
+    def _parse_json(self, json_data: dict[str, Any], request: int) -> DenkoviSnapshot:
+        """Parse JSON response from device and return the new coordinator data.
+
+        request is the state version the request was sent at; a response
+        overtaken by a later one leaves the state unchanged.
+        """
         try:
             current_state = json_data.get("CurrentState", {})
-            
-            # Parse relays with names
-            relays = {}
-            relay_names = {}
-            for idx, relay in enumerate(current_state.get("Relay", [])):
-                relay_id = idx + 1
-                relay_value = relay.get("Value")
-                # Values come as strings '0' or '1'
-                relays[relay_id] = str(relay_value) == '1'
-                relay_names[relay_id] = relay.get("Name", f"Relay {relay_id}")
-            
-            # Parse digital inputs with names (8 for IP-Maxi, 16 for Notifier)
-            digital_inputs = {}
-            digital_input_names = {}
-            counters = {}
-            for idx, digital_input in enumerate(current_state.get("DigitalInput", [])):
-                input_id = idx + 1
-                # Values come as strings '0' or '1'
-                digital_inputs[input_id] = str(digital_input.get("Value")) == '1'
-                counters[input_id] = int(digital_input.get("Count", 0))
-                digital_input_names[input_id] = digital_input.get("Name", f"DIN{input_id}")
-            
-            # Parse analog inputs with names
-            analog_inputs = {}
-            analog_input_names = {}
-            for idx, analog_input in enumerate(current_state.get("AnalogInput", [])):
-                input_id = idx + 1
-                measure = analog_input.get("Measure", "")
-                analog_input_names[input_id] = analog_input.get("Name", f"AIN{input_id}")
-                # Parse temperature values if present (e.g., "23.5 C")
-                if isinstance(measure, str) and " " in measure:
-                    value = measure.split(" ")[0]
-                    try:
-                        analog_inputs[input_id] = float(value)
-                    except ValueError:
-                        analog_inputs[input_id] = measure
-                else:
-                    analog_inputs[input_id] = measure
-            
-            # Parse analog outputs with names
-            analog_outputs = {}
-            analog_output_names = {}
-            for idx, analog_output in enumerate(current_state.get("AnalogOutput", [])):
-                output_id = idx + 1
-                analog_outputs[output_id] = analog_output.get("Value", 0)
-                analog_output_names[output_id] = analog_output.get("Name", f"AOUT{output_id}")
-            
-            # Parse temperature inputs (Notifier only)
-            temperature_inputs = {}
-            temperature_input_names = {}
-            for idx, temp_input in enumerate(current_state.get("TemperatureInput", [])):
-                input_id = idx + 1
-                value = temp_input.get("Value", "")
-                temperature_input_names[input_id] = temp_input.get("Name", f"TI{input_id}")
-                # Parse temperature values (e.g., "23.5 C" or "--- C")
-                if isinstance(value, str) and value != "--- C":
-                    try:
-                        temp_value = value.split(" ")[0]
-                        temperature_inputs[input_id] = float(temp_value)
-                    except (ValueError, IndexError):
-                        temperature_inputs[input_id] = None
-                else:
-                    temperature_inputs[input_id] = None
-            
-            # Parse device info
-            device_info = current_state.get("Device", {})
-
-            return {
-                "relays": relays,
-                "relay_names": relay_names,
-                "digital_inputs": digital_inputs,
-                "digital_input_names": digital_input_names,
-                "counters": counters,
-                "analog_inputs": analog_inputs,
-                "analog_input_names": analog_input_names,
-                "analog_outputs": analog_outputs,
-                "analog_output_names": analog_output_names,
-                "temperature_inputs": temperature_inputs,
-                "temperature_input_names": temperature_input_names,
-                "device": device_info,
-            }
+            snapshot = parse_snapshot(current_state)
+            if self._metadata_stale(snapshot):
+                self.metadata = parse_metadata(current_state)
+                self._metadata_refreshed = time.monotonic()
+            if self.state.confirm(request, snapshot):
+                self._async_schedule_save()
+                for state_callback in self._state_listeners:
+                    state_callback()
+            else:
+                _LOGGER.debug("Discarding late response from %s", self.host)
+            return self.state.view
 
         except (KeyError, ValueError) as err:
-            _LOGGER.error("Error parsing JSON: %s", err)
-            return {
-                "relays": {},
-                "relay_names": {},
-                "digital_inputs": {},
-                "digital_input_names": {},
-                "counters": {},
-                "analog_inputs": {},
-                "analog_input_names": {},
-                "analog_outputs": {},
-                "analog_output_names": {},
-                "temperature_inputs": {},
-                "temperature_input_names": {},
-                "device": {},
-            }
-
-    async def async_set_relay(self, relay_id: int, state: bool) -> None:
-        """Set relay state."""
-        # Optimistic update - set state immediately
-        current_data = dict(self.data)
-        current_data["relays"][relay_id] = state
-        self.async_set_updated_data(current_data)
+            raise UpdateFailed(f"Error parsing JSON: {err}") from err
+
+    def _metadata_stale(self, snapshot: DenkoviSnapshot) -> bool:
+        """Return True if the cached metadata must be re-read."""
+        if self._metadata_refreshed is None or not self.metadata.matches(snapshot):
+            return True
+        return time.monotonic() - self._metadata_refreshed >= METADATA_REFRESH_INTERVAL
 
+    async def async_set_relay(self, relay_id: int, state: bool, force: bool = False) -> None:
+        """Set relay state, unless the device already reported it (or force is set)."""
+        self._raise_if_unreachable()
         # Denkovi uses 1 for ON, 0 for OFF
-        state_value = 1 if state else 0
-        url = f"http://{self.host}:{self.port}/current_state.json?pw={self.password}&Relay{relay_id}={state_value}"
+        value = 1 if state else 0
+        if not force and self._write_is_noop(("relays", relay_id), value):
+            return
+        self._mark_activity()
+        await self._async_queue_write(("relays", relay_id), value)
 
+    async def async_set_analog_output(self, output_id: int, value: int, force: bool = False) -> None:
+        """Set analog output value, unless the device already reported it (or force is set)."""
+        self._raise_if_unreachable()
+        if not force and self._write_is_noop(("analog_outputs", output_id), value):
+            return
+        self._mark_activity()
+        await self._async_queue_write(("analog_outputs", output_id), value)
+
+    def _write_is_noop(self, channel: tuple[str, int], value: int) -> bool:
+        """Return True if the device recently reported value and no other value is on its way."""
+        confirmed = self.state.confirmed
+        if confirmed is None or self.state.has_overlay(channel):
+            return False
+        # The board may have been switched from elsewhere since an older report
+        if time.monotonic() - self.state.confirmed_at > self._scan_interval:
+            return False
+        kind, channel_id = channel
+        if kind == "relays":
+            reported = int(confirmed.relay(channel_id))
+        else:
+            reported = confirmed.analog_output(channel_id)
+        if reported != value:
+            return False
+        self.skipped_writes += 1
+        return True
+
+    def _raise_if_unreachable(self) -> None:
+        """Fail a write immediately instead of waiting for a board that is down."""
+        if self.breaker.is_open:
+            raise HomeAssistantError(
+                f"Denkovi SmartDEN at {self.host} is unreachable, retrying in the background"
+            )
+
+    async def _async_queue_write(self, channel: tuple[str, int], value: int) -> None:
+        """Queue a write and wait until the device confirmed the newest value for the channel.
+
+        Writes arriving within WRITE_COALESCE_DELAY of each other are merged into
+        a single current_state.json request, and only one request is in flight
+        at a time. A value queued for a channel replaces any value not yet sent,
+        so dragging a slider sends the latest position instead of every step.
+        """
+        # Optimistic update - show the value immediately
+        self.state.overlay(channel, value)
+        self.async_set_updated_data(self.state.view)
+
+        self._pending_writes[channel] = value
+        waiter: asyncio.Future[None] = self.hass.loop.create_future()
+        self._pending_waiters.setdefault(channel, []).append(waiter)
+
+        if self._flush_task is None:
+            self._flush_task = self.hass.async_create_task(self._async_flush_writes())
+
+        await waiter
+
+    async def _async_flush_writes(self) -> None:
+        """Send pending writes in batches until none are left."""
         try:
-            async with self._session.get(
-                url, timeout=aiohttp.ClientTimeout(total=10)
-            ) as response:
-                if response.status != 200:
-                    raise UpdateFailed(f"Error setting relay: HTTP {response.status}")
-                
-                # Parse response to confirm state
-                json_data = await response.json()
-                self.async_set_updated_data(self._parse_json(json_data))
+            while self._pending_writes:
+                await asyncio.sleep(WRITE_COALESCE_DELAY)
 
-        except aiohttp.ClientError as err:
-            # Roll back on error - request refresh to get actual state
-            await self.async_request_refresh()
-            raise UpdateFailed(f"Error communicating with device: {err}") from err
+                writes, self._pending_writes = self._pending_writes, {}
+                waiters, self._pending_waiters = self._pending_waiters, {}
+                try:
+                    error = await self._async_send_writes(writes)
+                except asyncio.CancelledError:
+                    for channel_waiters in waiters.values():
+                        for waiter in channel_waiters:
+                            waiter.cancel()
+                    raise
 
-    async def async_set_analog_output(self, output_id: int, value: int) -> None:
-        """Set analog output value."""
-        # Optimistic update - set value immediately
-        current_data = dict(self.data)
-        current_data["analog_outputs"][output_id] = value
-        self.async_set_updated_data(current_data)
+                for channel, channel_waiters in waiters.items():
+                    if channel in self._pending_writes:
+                        # Superseded while in flight, resolve with the newer value
+                        self._pending_waiters.setdefault(channel, [])[:0] = channel_waiters
+                        continue
+                    for waiter in channel_waiters:
+                        if waiter.done():
+                            continue
+                        if error is None:
+                            waiter.set_result(None)
+                        else:
+                            waiter.set_exception(error)
+        finally:
+            self._flush_task = None
 
-        url = f"http://{self.host}:{self.port}/current_state.json?pw={self.password}&AnalogOutput{output_id}={value}"
+    async def _async_send_writes(self, writes: dict[tuple[str, int], int]) -> Exception | None:
+        """Send one batch of writes and return the error, if any."""
+        params = "&".join(
+            f"{WRITE_PARAMS[kind]}{channel_id}={value}"
+            for (kind, channel_id), value in writes.items()
+        )
+        url = f"http://{self.host}:{self.port}/current_state.json?pw={self.password}&{params}"
+        requested_at = dt_util.utcnow()
+        started = time.monotonic()
+        versions = self.state.overlay_versions(list(writes))
 
+        error: Exception | None = None
+        status: int | None = None
+        body: bytes | None = None
         try:
-            async with self._session.get(
-                url, timeout=aiohttp.ClientTimeout(total=10)
-            ) as response:
-                if response.status != 200:
-                    raise UpdateFailed(f"Error setting analog output: HTTP {response.status}")
-                
-                # Parse response to confirm value
-                json_data = await response.json()
-                self.async_set_updated_data(self._parse_json(json_data))
+            async with self.requests.slot(PRIORITY_WRITE):
+                request = self.state.begin_request()
+                try:
+                    async with self._session.get(
+                        url, timeout=self.request_timeout, headers=self._request_headers
+                    ) as response:
+                        status = response.status
+                        body = await response.read()
+                        if response.status != 200:
+                            raise UpdateFailed(f"Error writing {params}: HTTP {response.status}")
+                    json_data = self._decode_json(body)
+                except (aiohttp.ClientError, asyncio.TimeoutError, UpdateFailed) as err:
+                    # Counts towards the circuit breaker just like a failed poll
+                    self._record_request_failure(err)
+                    raise
+                self._record_request_success()
 
-        except aiohttp.ClientError as err:
-            # Roll back on error - request refresh to get actual state
-            await self.async_request_refresh()
-            raise UpdateFailed(f"Error communicating with device: {err}") from err
+                # Parse response once to confirm all written values; values
+                # queued meanwhile stay optimistic
+                self._parse_json(json_data, request)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            error = UpdateFailed(f"Error communicating with device: {err}")
+            error.__cause__ = err
+        except UpdateFailed as err:
+            error = err
+        except Exception as err:  # pylint: disable=broad-except
+            # Never leave callers waiting on a batch that failed unexpectedly
+            error = err
+        finally:
+            # Drop the overlays of this batch: confirmed values are in the new base,
+            # failed ones roll back to the value the device last reported
+            self.state.settle(versions)
+
+        if error is None:
+            self.async_set_updated_data(self.state.view)
+        else:
+            self.data = self.state.view
+            self.async_update_listeners()
+
+        duration = time.monotonic() - started
+        error_text = None if error is None else str(error) or type(error).__name__
+        self.recent_writes.append(WriteRecord(requested_at, duration, params, error=error_text))
+        self._capture_traffic(requested_at, duration, params, status, body, error_text)
+        return error
 
     async def async_shutdown(self) -> None:
-        """Close the aiohttp session."""
-        if self._session:
-            await self._session.close()
+        """Cancel the poll and writes, write out the traffic capture and store the snapshot."""
+        if (poll_task := self._poll_task) is not None:
+            # Must not finish against the released session or save after removal
+            poll_task.cancel()
+            await asyncio.wait([poll_task])
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        for waiters in self._pending_waiters.values():
+            for waiter in waiters:
+                waiter.cancel()
+        self._pending_waiters = {}
+        self._pending_writes = {}
+        self.state.clear()
+        if self.capture is not None:
+            await self.capture.async_close()
+        if self._save_scheduled:
+            await self._store.async_save(self._data_to_store())
@@ -0,0 +1,93 @@
+"""Diagnostics support for Denkovi SmartDEN."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import DenkoviDataUpdateCoordinator
+
+TO_REDACT = {CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: DenkoviDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    stats = coordinator.stats
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "model": coordinator.get_device_model(),
+            "platforms": coordinator.platforms,
+            "last_update_success": coordinator.last_update_success,
+            "poll_interval": coordinator.poll_interval,
+            "fast_polling": coordinator.fast_polling,
+            "schedule_slip": coordinator.schedule_slip,
+            "skipped_writes": coordinator.skipped_writes,
+        },
+        "state": {
+            "version": coordinator.state.version,
+            "overlays": coordinator.state.overlay_count,
+            "discarded_responses": coordinator.state.discarded_responses,
+        },
+        "request_queue": {
+            "depth": coordinator.requests.depth,
+            "max_depth": coordinator.requests.max_depth,
+            "wait_p50": coordinator.requests.wait_percentile(50),
+            "wait_p95": coordinator.requests.wait_percentile(95),
+            "skipped_polls": coordinator.skipped_polls,
+        },
+        "timeouts": {
+            "connect": coordinator.request_timeout.sock_connect,
+            "read": coordinator.request_timeout.sock_read,
+            "total": coordinator.request_timeout.total,
+        },
+        "connection_profile": coordinator.connection_profile.as_dict(),
+        "circuit_breaker": {
+            "open": coordinator.breaker.is_open,
+            "failures": coordinator.breaker.failures,
+            "probe_interval": coordinator.breaker.probe_interval,
+        },
+        "stats": {
+            "last_rtt": stats.last_rtt,
+            "rtt_p50": stats.rtt_percentile(50),
+            "rtt_p95": stats.rtt_percentile(95),
+            "success_ratio": stats.success_ratio,
+            "consecutive_failures": stats.consecutive_failures,
+            "last_bytes": stats.last_bytes,
+            "last_parse_time": stats.last_parse_time,
+            "poll_rate": stats.poll_rate,
+        },
+        "snapshot": coordinator.data.as_dict() if coordinator.data else None,
+        "metadata": coordinator.metadata.as_dict(),
+        "recent_payloads": [
+            {
+                "time": record.time.isoformat(),
+                "duration": record.duration,
+                "payload": (
+                    record.body.decode(errors="replace") if record.body is not None else None
+                ),
+                "error": record.error,
+            }
+            for record in coordinator.recent_payloads
+        ],
+        "recent_writes": [
+            {
+                "time": record.time.isoformat(),
+                "duration": record.duration,
+                "params": record.params,
+                "error": record.error,
+            }
+            for record in coordinator.recent_writes
+        ],
+    }
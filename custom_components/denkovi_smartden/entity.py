@@ -0,0 +1,27 @@
+"""Base entity for Denkovi SmartDEN."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import DenkoviDataUpdateCoordinator
+
+
+class DenkoviEntity(CoordinatorEntity):
+    """Coordinator entity that only writes state when its channel changed."""
+
+    coordinator: DenkoviDataUpdateCoordinator
+
+    # (channel type, channel id) this entity represents, e.g. ("relays", 3)
+    _channel: tuple[str, int] | None = None
+
+    _last_available: bool | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the channel value or availability changed."""
+        available = self.available
+        if available == self._last_available and not self.coordinator.channel_changed(self._channel):
+            return
+        self._last_available = available
+        super()._handle_coordinator_update()
@@ -8,11 +8,11 @@ from homeassistant.components.light import LightEntity, ColorMode
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN
 from .coordinator import DenkoviDataUpdateCoordinator
+from .entity import DenkoviEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,7 +36,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class DenkoviLight(CoordinatorEntity, LightEntity):
+class DenkoviLight(DenkoviEntity, LightEntity):
     """Representation of a Denkovi SmartDEN light."""
 
     _attr_color_mode = ColorMode.ONOFF
@@ -51,9 +51,10 @@ class DenkoviLight(CoordinatorEntity, LightEntity):
         """Initialize the light."""
         super().__init__(coordinator)
         self._relay_id = relay_id
+        self._channel = ("relays", relay_id)
         self._entry = entry
         # Use name from API, fallback to generic name
-        relay_name = coordinator.data.get("relay_names", {}).get(relay_id, f"Light {relay_id}")
+        relay_name = coordinator.metadata.relay_name(relay_id, f"Light {relay_id}")
         self._attr_name = relay_name
         self._attr_unique_id = f"{entry.entry_id}_light_{relay_id}"
         self._attr_device_info = DeviceInfo(
@@ -66,7 +67,7 @@ class DenkoviLight(CoordinatorEntity, LightEntity):
     @property
     def is_on(self) -> bool:
         """Return true if light is on."""
-        return self.coordinator.data.get("relays", {}).get(self._relay_id, False)
+        return self.coordinator.data.relay(self._relay_id)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
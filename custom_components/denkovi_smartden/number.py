@@ -8,10 +8,10 @@ from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import DenkoviDataUpdateCoordinator
+from .entity import DenkoviEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,14 +27,13 @@ async def async_setup_entry(
     entities = []
     
     # Create number entities for analog outputs
-    analog_outputs = coordinator.data.get("analog_outputs", {})
-    for output_id in analog_outputs.keys():
+    for output_id in coordinator.capabilities.analog_output_ids:
         entities.append(DenkoviAnalogOutputNumber(coordinator, entry, output_id))
 
     async_add_entities(entities)
 
 
-class DenkoviAnalogOutputNumber(CoordinatorEntity, NumberEntity):
+class DenkoviAnalogOutputNumber(DenkoviEntity, NumberEntity):
     """Representation of a Denkovi analog output as a number entity."""
 
     _attr_mode = NumberMode.SLIDER
@@ -51,11 +50,11 @@ class DenkoviAnalogOutputNumber(CoordinatorEntity, NumberEntity):
         """Initialize the number entity."""
         super().__init__(coordinator)
         self._output_id = output_id
+        self._channel = ("analog_outputs", output_id)
         self._attr_unique_id = f"{entry.entry_id}_analog_output_{output_id}"
         
         # Use custom name from API
-        output_names = coordinator.data.get("analog_output_names", {})
-        self._attr_name = output_names.get(output_id, f"Analog Output {output_id}")
+        self._attr_name = coordinator.metadata.analog_output_name(output_id, f"Analog Output {output_id}")
         
         # Device info for grouping
         self._attr_device_info = {
@@ -68,14 +67,10 @@ class DenkoviAnalogOutputNumber(CoordinatorEntity, NumberEntity):
     @property
     def native_value(self) -> float | None:
         """Return the current value."""
-        analog_outputs = self.coordinator.data.get("analog_outputs", {})
-        value = analog_outputs.get(self._output_id)
-        if value is not None:
-            try:
-                return float(value)
-            except (ValueError, TypeError):
-                return None
-        return None
+        value = self.coordinator.data.analog_output(self._output_id)
+        if value is None:
+            return None
+        return float(value)
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the analog output value."""
@@ -0,0 +1,90 @@
+"""Prioritized request queue for one Denkovi SmartDEN board."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+import heapq
+import itertools
+import time
+
+from .stats import nearest_rank
+
+# Lower runs first
+PRIORITY_WRITE = 0
+PRIORITY_POLL = 1
+
+
+class RequestQueue:
+    """Hand out request slots to a board, writes before polls.
+
+    At most max_concurrent requests run at once; the rest wait in priority
+    order, first come first served within a priority. The time spent waiting
+    and the number of requests waiting are kept for the last window requests.
+    """
+
+    def __init__(self, max_concurrent: int, window: int) -> None:
+        """Initialize the queue."""
+        self.max_concurrent = max_concurrent
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._waits: deque[float] = deque(maxlen=window)
+        self._depths: deque[int] = deque(maxlen=window)
+
+    @property
+    def depth(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        return sum(not waiter.done() for _, _, waiter in self._waiters)
+
+    @property
+    def max_depth(self) -> int | None:
+        """Return the most requests seen waiting over the window."""
+        return max(self._depths, default=None)
+
+    def wait_percentile(self, percentile: float) -> float | None:
+        """Return a percentile (0-100) of the seconds requests waited for a slot."""
+        return nearest_rank(self._waits, percentile)
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """Wait for a slot and hold it for the duration of the block."""
+        queued = time.monotonic()
+        if self._active < self.max_concurrent and not self.depth:
+            self._active += 1
+            self._depths.append(0)
+        else:
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            self._depths.append(self.depth)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just before the cancellation
+                    self._release()
+                raise
+        self._waits.append(time.monotonic() - queued)
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def exclusive(self, priority: int) -> AsyncIterator[None]:
+        """Wait for every slot and hold them all for the duration of the block."""
+        async with AsyncExitStack() as stack:
+            for _ in range(self.max_concurrent):
+                await stack.enter_async_context(self.slot(priority))
+            yield
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
@@ -0,0 +1,109 @@
+"""Domain-wide poll scheduler for Denkovi SmartDEN."""
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+import logging
+import math
+import zlib
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN, FLEET_MAX_CONCURRENT_POLLS
+from .coordinator import DenkoviDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DenkoviPollScheduler:
+    """Poll every registered board, staggered and with bounded concurrency.
+
+    Each board gets a fixed phase within its poll interval derived from its
+    address, so boards set up at the same moment do not poll in lockstep.
+    At most FLEET_MAX_CONCURRENT_POLLS polls run at once; polls waiting for a
+    slot are late, and the delay is stored on the coordinator as schedule_slip.
+
+    Any full state response counts as a poll: when a write or an unscheduled
+    refresh delivers the board's state, its next poll is pushed back by whole
+    intervals until it is at least one interval away, keeping the board's phase.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_concurrent: int = FLEET_MAX_CONCURRENT_POLLS
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._timers: dict[DenkoviDataUpdateCoordinator, asyncio.TimerHandle] = {}
+        self._tasks: dict[DenkoviDataUpdateCoordinator, asyncio.Task[None]] = {}
+        self._unsubscribe: dict[DenkoviDataUpdateCoordinator, CALLBACK_TYPE] = {}
+
+    async def async_setup_connection(self, coordinator: DenkoviDataUpdateCoordinator) -> None:
+        """Probe a board's connection, within the same concurrency limit as polls."""
+        async with self._semaphore:
+            await coordinator.async_setup_connection()
+
+    @callback
+    def async_register(self, coordinator: DenkoviDataUpdateCoordinator) -> None:
+        """Start polling a board at its phase within the poll interval."""
+        address = f"{coordinator.host}:{coordinator.port}".encode()
+        phase = (zlib.crc32(address) % 1000) / 1000
+        self._schedule(coordinator, self.hass.loop.time() + phase * coordinator.poll_interval)
+        self._unsubscribe[coordinator] = coordinator.async_add_state_listener(
+            partial(self._async_state_received, coordinator)
+        )
+
+    @callback
+    def async_unregister(self, coordinator: DenkoviDataUpdateCoordinator) -> None:
+        """Stop polling a board."""
+        if unsubscribe := self._unsubscribe.pop(coordinator, None):
+            unsubscribe()
+        if timer := self._timers.pop(coordinator, None):
+            timer.cancel()
+        if task := self._tasks.pop(coordinator, None):
+            task.cancel()
+
+    @callback
+    def _schedule(self, coordinator: DenkoviDataUpdateCoordinator, due: float) -> None:
+        """Schedule the next poll of a board at loop time due."""
+        if timer := self._timers.pop(coordinator, None):
+            timer.cancel()
+        self._timers[coordinator] = self.hass.loop.call_at(due, self._start_poll, coordinator, due)
+
+    @callback
+    def _async_state_received(self, coordinator: DenkoviDataUpdateCoordinator) -> None:
+        """Re-arm the poll timer of a board whose state just arrived outside a poll."""
+        if coordinator in self._tasks or (timer := self._timers.get(coordinator)) is None:
+            # The scheduled poll is running and reschedules itself
+            return
+        interval = coordinator.poll_interval
+        earliest = self.hass.loop.time() + interval
+        due = timer.when()
+        if due >= earliest:
+            return
+        # Whole intervals, so boards that all got a response at once stay staggered
+        self._schedule(coordinator, due + math.ceil((earliest - due) / interval) * interval)
+
+    @callback
+    def _start_poll(self, coordinator: DenkoviDataUpdateCoordinator, due: float) -> None:
+        """Run a scheduled poll."""
+        self._timers.pop(coordinator, None)
+        self._tasks[coordinator] = self.hass.async_create_background_task(
+            self._async_poll(coordinator, due), f"{DOMAIN} poll {coordinator.host}"
+        )
+
+    async def _async_poll(self, coordinator: DenkoviDataUpdateCoordinator, due: float) -> None:
+        """Poll a board once a concurrency slot is free, then schedule the next poll."""
+        async with self._semaphore:
+            coordinator.schedule_slip = slip = self.hass.loop.time() - due
+            if slip > coordinator.poll_interval:
+                _LOGGER.debug("Poll of %s started %.2f seconds late", coordinator.host, slip)
+            await coordinator.async_refresh()
+
+        if self._tasks.pop(coordinator, None) is None:
+            # Unregistered while polling
+            return
+
+        # Keep the board's phase unless the poll overran the whole interval
+        now = self.hass.loop.time()
+        self._schedule(coordinator, max(due + coordinator.poll_interval, now))
@@ -1,18 +1,32 @@
 """Support for Denkovi SmartDEN sensors."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
 import logging
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfFrequency,
+    UnitOfInformation,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN
 from .coordinator import DenkoviDataUpdateCoordinator
+from .entity import DenkoviEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,26 +42,30 @@ async def async_setup_entry(
     entities = []
     
     # Create counter sensors for each digital input
-    counters = coordinator.data.get("counters", {})
-    for input_id in counters:
+    for input_id in coordinator.capabilities.digital_input_ids:
         entities.append(DenkoviCounterSensor(coordinator, entry, input_id))
     
     # Create analog input sensors
-    analog_inputs = coordinator.data.get("analog_inputs", {})
-    for input_id in analog_inputs:
+    for input_id in coordinator.capabilities.analog_input_ids:
         # Inputs 5-8 are typically temperature sensors on IP-Maxi
         is_temperature = input_id >= 5
         entities.append(DenkoviAnalogSensor(coordinator, entry, input_id, is_temperature))
     
     # Create dedicated temperature input sensors (Notifier only)
-    temperature_inputs = coordinator.data.get("temperature_inputs", {})
-    for input_id in temperature_inputs:
+    for input_id in coordinator.capabilities.temperature_input_ids:
         entities.append(DenkoviTemperatureSensor(coordinator, entry, input_id))
 
+    # Opt-in diagnostic sensors about polling
+    entities.extend(
+        DenkoviDiagnosticSensor(coordinator, entry, description)
+        for description in DIAGNOSTIC_SENSORS
+        if description.exists_fn(coordinator)
+    )
+
     async_add_entities(entities)
 
 
-class DenkoviCounterSensor(CoordinatorEntity, SensorEntity):
+class DenkoviCounterSensor(DenkoviEntity, SensorEntity):
     """Representation of a Denkovi SmartDEN counter sensor."""
 
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
@@ -61,8 +79,9 @@ class DenkoviCounterSensor(CoordinatorEntity, SensorEntity):
         """Initialize the counter sensor."""
         super().__init__(coordinator)
         self._input_id = input_id
+        self._channel = ("counters", input_id)
         # Use name from API, fallback to generic name
-        input_name = coordinator.data.get("digital_input_names", {}).get(input_id, f"DIN{input_id}")
+        input_name = coordinator.metadata.digital_input_name(input_id, f"DIN{input_id}")
         self._attr_name = f"{input_name} Counter"
         self._attr_unique_id = f"{entry.entry_id}_counter_{input_id}"
         self._attr_device_info = DeviceInfo(
@@ -75,10 +94,10 @@ class DenkoviCounterSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> int | None:
         """Return the state of the sensor."""
-        return self.coordinator.data.get("counters", {}).get(self._input_id)
+        return self.coordinator.data.counter(self._input_id)
 
 
-class DenkoviAnalogSensor(CoordinatorEntity, SensorEntity):
+class DenkoviAnalogSensor(DenkoviEntity, SensorEntity):
     """Representation of a Denkovi SmartDEN analog input sensor."""
 
     def __init__(
@@ -91,9 +110,10 @@ class DenkoviAnalogSensor(CoordinatorEntity, SensorEntity):
         """Initialize the analog sensor."""
         super().__init__(coordinator)
         self._input_id = input_id
+        self._channel = ("analog_inputs", input_id)
         self._is_temperature = is_temperature
         # Use name from API, fallback to generic name
-        input_name = coordinator.data.get("analog_input_names", {}).get(input_id, f"Analog Input {input_id}")
+        input_name = coordinator.metadata.analog_input_name(input_id, f"Analog Input {input_id}")
         self._attr_name = input_name
         self._attr_unique_id = f"{entry.entry_id}_analog_input_{input_id}"
         self._attr_device_info = DeviceInfo(
@@ -109,16 +129,13 @@ class DenkoviAnalogSensor(CoordinatorEntity, SensorEntity):
             self._attr_state_class = SensorStateClass.MEASUREMENT
 
     @property
-    def native_value(self) -> float | str | None:
+    def native_value(self) -> float | None:
         """Return the state of the sensor."""
-        value = self.coordinator.data.get("analog_inputs", {}).get(self._input_id)
-        # Return None for invalid values like '---' when sensor expects numeric
-        if self._is_temperature and isinstance(value, str) and not value.replace('.', '', 1).replace('-', '', 1).isdigit():
-            return None
-        return value
+        # Invalid readings like '---' are already None in the snapshot
+        return self.coordinator.data.analog_input(self._input_id)
 
 
-class DenkoviTemperatureSensor(CoordinatorEntity, SensorEntity):
+class DenkoviTemperatureSensor(DenkoviEntity, SensorEntity):
     """Representation of a Denkovi SmartDEN dedicated temperature sensor (Notifier)."""
 
     _attr_device_class = SensorDeviceClass.TEMPERATURE
@@ -134,8 +151,9 @@ class DenkoviTemperatureSensor(CoordinatorEntity, SensorEntity):
         """Initialize the temperature sensor."""
         super().__init__(coordinator)
         self._input_id = input_id
+        self._channel = ("temperature_inputs", input_id)
         # Use name from API, fallback to generic name
-        input_name = coordinator.data.get("temperature_input_names", {}).get(input_id, f"Temperature {input_id}")
+        input_name = coordinator.metadata.temperature_input_name(input_id, f"Temperature {input_id}")
         self._attr_name = input_name
         self._attr_unique_id = f"{entry.entry_id}_temperature_{input_id}"
         self._attr_device_info = DeviceInfo(
@@ -148,4 +166,166 @@ class DenkoviTemperatureSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> float | None:
         """Return the state of the sensor."""
-        return self.coordinator.data.get("temperature_inputs", {}).get(self._input_id)
+        return self.coordinator.data.temperature_input(self._input_id)
+
+
+@dataclass(frozen=True, kw_only=True)
+class DenkoviDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a Denkovi SmartDEN diagnostic sensor."""
+
+    value_fn: Callable[[DenkoviDataUpdateCoordinator], float | int | None]
+    exists_fn: Callable[[DenkoviDataUpdateCoordinator], bool] = lambda coordinator: True
+
+
+DIAGNOSTIC_SENSORS: tuple[DenkoviDiagnosticSensorEntityDescription, ...] = (
+    DenkoviDiagnosticSensorEntityDescription(
+        key="poll_rate",
+        name="Poll rate",
+        native_unit_of_measurement=UnitOfFrequency.HERTZ,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda coordinator: _round(coordinator.stats.poll_rate, 1),
+        # Only meaningful when fast input polling is on
+        exists_fn=lambda coordinator: coordinator.fast_polling,
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="schedule_slip",
+        name="Poll schedule slip",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _round(_ms(coordinator.schedule_slip), -1),
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="last_rtt",
+        name="Last poll round-trip time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _round(_ms(coordinator.stats.last_rtt), 0),
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="rtt_p50",
+        name="Poll latency p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _round(_ms(coordinator.stats.rtt_percentile(50)), 0),
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="rtt_p95",
+        name="Poll latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _round(_ms(coordinator.stats.rtt_percentile(95)), 0),
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="poll_success_ratio",
+        name="Poll success ratio",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _round(_percent(coordinator.stats.success_ratio), 0),
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="consecutive_failures",
+        name="Consecutive poll failures",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.stats.consecutive_failures,
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="response_size",
+        name="Response size",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.stats.last_bytes,
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="parse_time",
+        name="Parse time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _round(_ms(coordinator.stats.last_parse_time), 2),
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="queue_wait_p95",
+        name="Request queue wait p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _round(_ms(coordinator.requests.wait_percentile(95)), 0),
+    ),
+    DenkoviDiagnosticSensorEntityDescription(
+        key="queue_depth",
+        name="Request queue depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        # Most requests seen waiting, the queue is usually empty when polled
+        value_fn=lambda coordinator: coordinator.requests.max_depth,
+    ),
+)
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Convert seconds to milliseconds."""
+    return seconds * 1000 if seconds is not None else None
+
+
+def _percent(ratio: float | None) -> float | None:
+    """Convert a ratio to a percentage."""
+    return ratio * 100 if ratio is not None else None
+
+
+def _round(value: float | None, digits: int) -> float | None:
+    """Round a value that may be missing."""
+    return round(value, digits) if value is not None else None
+
+
+class DenkoviDiagnosticSensor(DenkoviEntity, SensorEntity):
+    """Opt-in diagnostic sensor reporting how the coordinator polls a board."""
+
+    entity_description: DenkoviDiagnosticSensorEntityDescription
+
+    # Generic names like "Poll rate" are prefixed with the device name
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: DenkoviDataUpdateCoordinator,
+        entry: ConfigEntry,
+        description: DenkoviDiagnosticSensorEntityDescription,
+    ) -> None:
+        """Initialize the diagnostic sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=f"Denkovi SmartDEN ({coordinator.host})",
+            manufacturer="Denkovi",
+            model=coordinator.get_device_model(),
+        )
+        self._last_written: float | int | None = None
+
+    @property
+    def available(self) -> bool:
+        """Stay available while polls fail, failures are what these report."""
+        return True
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the diagnostic value."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the rounded value or availability changed."""
+        value = self.native_value
+        if value == self._last_written and self.available == self._last_available:
+            return
+        self._last_written = value
+        self._last_available = self.available
+        self.async_write_ha_state()
@@ -0,0 +1,444 @@
+"""Compact state snapshot for Denkovi SmartDEN."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass, field, replace
+import math
+from typing import Any
+
+NAN = float("nan")
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Yield the 1-based positions of the bits set in mask."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length()
+        mask ^= low
+
+
+def _float_or_nan(value: Any) -> float:
+    """Convert a value like '23.5' to float, NaN if it is not numeric."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _int_or_zero(value: Any) -> int:
+    """Convert a value like '512' to int, 0 if it is not numeric."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return 0
+
+
+def _optional(value: float) -> float | None:
+    """Return None for NaN slots."""
+    return None if math.isnan(value) else value
+
+
+@dataclass(frozen=True, slots=True)
+class DenkoviSnapshot:
+    """Values of all channels at one point in time.
+
+    Relays and digital inputs are bitmasks (bit 0 is channel 1). Counters and
+    analog values live in typed arrays; NaN marks an unavailable reading.
+    Snapshots are never mutated, updates create a new one.
+    """
+
+    relay_count: int = 0
+    relays: int = 0
+    digital_input_count: int = 0
+    digital_inputs: int = 0
+    counters: array = field(default_factory=lambda: array("q"))
+    analog_inputs: array = field(default_factory=lambda: array("d"))
+    analog_outputs: array = field(default_factory=lambda: array("q"))
+    temperature_inputs: array = field(default_factory=lambda: array("d"))
+
+    @property
+    def relay_ids(self) -> range:
+        """Return the ids of all relays."""
+        return range(1, self.relay_count + 1)
+
+    @property
+    def digital_input_ids(self) -> range:
+        """Return the ids of all digital inputs."""
+        return range(1, self.digital_input_count + 1)
+
+    @property
+    def analog_input_ids(self) -> range:
+        """Return the ids of all analog inputs."""
+        return range(1, len(self.analog_inputs) + 1)
+
+    @property
+    def analog_output_ids(self) -> range:
+        """Return the ids of all analog outputs."""
+        return range(1, len(self.analog_outputs) + 1)
+
+    @property
+    def temperature_input_ids(self) -> range:
+        """Return the ids of all temperature inputs."""
+        return range(1, len(self.temperature_inputs) + 1)
+
+    def relay(self, relay_id: int) -> bool:
+        """Return True if the relay is on."""
+        return bool(self.relays >> (relay_id - 1) & 1)
+
+    def digital_input(self, input_id: int) -> bool:
+        """Return True if the digital input is active."""
+        return bool(self.digital_inputs >> (input_id - 1) & 1)
+
+    def counter(self, input_id: int) -> int | None:
+        """Return the pulse counter of a digital input."""
+        if 0 < input_id <= len(self.counters):
+            return self.counters[input_id - 1]
+        return None
+
+    def analog_input(self, input_id: int) -> float | None:
+        """Return the measured value of an analog input."""
+        if 0 < input_id <= len(self.analog_inputs):
+            return _optional(self.analog_inputs[input_id - 1])
+        return None
+
+    def analog_output(self, output_id: int) -> int | None:
+        """Return the value of an analog output."""
+        if 0 < output_id <= len(self.analog_outputs):
+            return self.analog_outputs[output_id - 1]
+        return None
+
+    def temperature_input(self, input_id: int) -> float | None:
+        """Return the temperature of a temperature input."""
+        if 0 < input_id <= len(self.temperature_inputs):
+            return _optional(self.temperature_inputs[input_id - 1])
+        return None
+
+    def with_relay(self, relay_id: int, state: bool) -> DenkoviSnapshot:
+        """Return a copy with one relay changed."""
+        bit = 1 << (relay_id - 1)
+        relays = self.relays | bit if state else self.relays & ~bit
+        return replace(self, relays=relays)
+
+    def with_analog_output(self, output_id: int, value: int) -> DenkoviSnapshot:
+        """Return a copy with one analog output changed."""
+        analog_outputs = array("q", self.analog_outputs)
+        analog_outputs[output_id - 1] = value
+        return replace(self, analog_outputs=analog_outputs)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot as plain lists, for diagnostics and storage."""
+        return {
+            "relays": [self.relay(relay_id) for relay_id in self.relay_ids],
+            "digital_inputs": [self.digital_input(input_id) for input_id in self.digital_input_ids],
+            "counters": self.counters.tolist(),
+            "analog_inputs": [self.analog_input(input_id) for input_id in self.analog_input_ids],
+            "analog_outputs": self.analog_outputs.tolist(),
+            "temperature_inputs": [
+                self.temperature_input(input_id) for input_id in self.temperature_input_ids
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DenkoviSnapshot:
+        """Create a snapshot from the output of as_dict."""
+        relays = data["relays"]
+        digital_inputs = data["digital_inputs"]
+        return cls(
+            relay_count=len(relays),
+            relays=sum(1 << idx for idx, state in enumerate(relays) if state),
+            digital_input_count=len(digital_inputs),
+            digital_inputs=sum(1 << idx for idx, state in enumerate(digital_inputs) if state),
+            counters=array("q", data["counters"]),
+            analog_inputs=array("d", (_float_or_nan(value) for value in data["analog_inputs"])),
+            analog_outputs=array("q", data["analog_outputs"]),
+            temperature_inputs=array(
+                "d", (_float_or_nan(value) for value in data["temperature_inputs"])
+            ),
+        )
+
+    def same_shape(self, other: DenkoviSnapshot) -> bool:
+        """Return True if both snapshots have the same channel counts."""
+        return (
+            self.relay_count == other.relay_count
+            and self.digital_input_count == other.digital_input_count
+            and len(self.counters) == len(other.counters)
+            and len(self.analog_inputs) == len(other.analog_inputs)
+            and len(self.analog_outputs) == len(other.analog_outputs)
+            and len(self.temperature_inputs) == len(other.temperature_inputs)
+        )
+
+    def changed_channels(self, previous: DenkoviSnapshot) -> set[tuple[str, int]] | None:
+        """Return the (channel type, id) pairs that differ from previous.
+
+        None means the channel layout changed and everything must be updated.
+        """
+        if not self.same_shape(previous):
+            return None
+
+        changed: set[tuple[str, int]] = set()
+        changed.update(("relays", bit) for bit in _bits(self.relays ^ previous.relays))
+        changed.update(
+            ("digital_inputs", bit)
+            for bit in _bits(self.digital_inputs ^ previous.digital_inputs)
+        )
+        for channel_type in ("counters", "analog_inputs", "analog_outputs", "temperature_inputs"):
+            new_values: array = getattr(self, channel_type)
+            old_values: array = getattr(previous, channel_type)
+            # Compare raw bytes first so NaN slots compare equal to themselves
+            if new_values.tobytes() == old_values.tobytes():
+                continue
+            for idx, (new, old) in enumerate(zip(new_values, old_values)):
+                if new != old and (new == new or old == old):
+                    changed.add((channel_type, idx + 1))
+        return changed
+
+
+@dataclass(frozen=True, slots=True)
+class DenkoviMetadata:
+    """Channel names and device information."""
+
+    relay_names: tuple[str, ...] = ()
+    digital_input_names: tuple[str, ...] = ()
+    analog_input_names: tuple[str, ...] = ()
+    analog_output_names: tuple[str, ...] = ()
+    temperature_input_names: tuple[str, ...] = ()
+    device: dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the names and device information as plain data for storage."""
+        return {
+            "relay_names": list(self.relay_names),
+            "digital_input_names": list(self.digital_input_names),
+            "analog_input_names": list(self.analog_input_names),
+            "analog_output_names": list(self.analog_output_names),
+            "temperature_input_names": list(self.temperature_input_names),
+            "device": self.device,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DenkoviMetadata:
+        """Create metadata from the output of as_dict."""
+        return cls(
+            relay_names=tuple(data["relay_names"]),
+            digital_input_names=tuple(data["digital_input_names"]),
+            analog_input_names=tuple(data["analog_input_names"]),
+            analog_output_names=tuple(data["analog_output_names"]),
+            temperature_input_names=tuple(data["temperature_input_names"]),
+            device=data["device"],
+        )
+
+    def matches(self, snapshot: DenkoviSnapshot) -> bool:
+        """Return True if there is a name for every channel in the snapshot."""
+        return (
+            len(self.relay_names) == snapshot.relay_count
+            and len(self.digital_input_names) == snapshot.digital_input_count
+            and len(self.analog_input_names) == len(snapshot.analog_inputs)
+            and len(self.analog_output_names) == len(snapshot.analog_outputs)
+            and len(self.temperature_input_names) == len(snapshot.temperature_inputs)
+        )
+
+    @staticmethod
+    def _name(names: tuple[str, ...], channel_id: int, default: str) -> str:
+        """Return the name at a 1-based channel id."""
+        if 0 < channel_id <= len(names):
+            return names[channel_id - 1]
+        return default
+
+    def relay_name(self, relay_id: int, default: str) -> str:
+        """Return the name of a relay."""
+        return self._name(self.relay_names, relay_id, default)
+
+    def digital_input_name(self, input_id: int, default: str) -> str:
+        """Return the name of a digital input."""
+        return self._name(self.digital_input_names, input_id, default)
+
+    def analog_input_name(self, input_id: int, default: str) -> str:
+        """Return the name of an analog input."""
+        return self._name(self.analog_input_names, input_id, default)
+
+    def analog_output_name(self, output_id: int, default: str) -> str:
+        """Return the name of an analog output."""
+        return self._name(self.analog_output_names, output_id, default)
+
+    def temperature_input_name(self, input_id: int, default: str) -> str:
+        """Return the name of a temperature input."""
+        return self._name(self.temperature_input_names, input_id, default)
+
+
+@dataclass(frozen=True, slots=True)
+class DenkoviCapabilities:
+    """Channel counts and model of a board, stored with the config entry."""
+
+    relays: int = 0
+    digital_inputs: int = 0
+    analog_inputs: int = 0
+    analog_outputs: int = 0
+    temperature_inputs: int = 0
+
+    @classmethod
+    def from_snapshot(cls, snapshot: DenkoviSnapshot) -> DenkoviCapabilities:
+        """Return the capabilities of the board a snapshot was read from."""
+        return cls(
+            relays=snapshot.relay_count,
+            digital_inputs=snapshot.digital_input_count,
+            analog_inputs=len(snapshot.analog_inputs),
+            analog_outputs=len(snapshot.analog_outputs),
+            temperature_inputs=len(snapshot.temperature_inputs),
+        )
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the channel counts for the config entry."""
+        return {
+            "relays": self.relays,
+            "digital_inputs": self.digital_inputs,
+            "analog_inputs": self.analog_inputs,
+            "analog_outputs": self.analog_outputs,
+            "temperature_inputs": self.temperature_inputs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, int] | None) -> DenkoviCapabilities | None:
+        """Return stored capabilities, or None if none were stored."""
+        if not data:
+            return None
+        try:
+            return cls(**data)
+        except TypeError:
+            return None
+
+    @property
+    def model(self) -> str:
+        """Determine device model based on capabilities."""
+        # Notifier has temperature inputs, no relays/outputs
+        if self.temperature_inputs and not self.relays:
+            return "SmartDEN Notifier"
+        # IP-Maxi has relays and analog outputs
+        if self.relays or self.analog_outputs:
+            return "SmartDEN IP-Maxi"
+        return "SmartDEN"
+
+    @property
+    def empty(self) -> bool:
+        """Return True if no channels were found, e.g. for an unreadable payload."""
+        return not (
+            self.relays
+            or self.digital_inputs
+            or self.analog_inputs
+            or self.analog_outputs
+            or self.temperature_inputs
+        )
+
+    @property
+    def relay_ids(self) -> range:
+        """Return the ids of all relays."""
+        return range(1, self.relays + 1)
+
+    @property
+    def digital_input_ids(self) -> range:
+        """Return the ids of all digital inputs."""
+        return range(1, self.digital_inputs + 1)
+
+    @property
+    def analog_input_ids(self) -> range:
+        """Return the ids of all analog inputs."""
+        return range(1, self.analog_inputs + 1)
+
+    @property
+    def analog_output_ids(self) -> range:
+        """Return the ids of all analog outputs."""
+        return range(1, self.analog_outputs + 1)
+
+    @property
+    def temperature_input_ids(self) -> range:
+        """Return the ids of all temperature inputs."""
+        return range(1, self.temperature_inputs + 1)
+
+
+def _parse_reading(value: Any) -> float:
+    """Parse a reading like '23.5 C', '512' or 23.5, NaN for '---' or '--- C'."""
+    if isinstance(value, str):
+        value = value.partition(" ")[0]
+        # Unconnected probes are common, skip raising and catching for them
+        if value == "---":
+            return NAN
+    return _float_or_nan(value)
+
+
+def parse_snapshot(current_state: dict[str, Any]) -> DenkoviSnapshot:
+    """Extract channel values from the CurrentState object.
+
+    Raises ValueError if the payload does not have the expected structure.
+    """
+    try:
+        relays = current_state.get("Relay", ())
+        digital_inputs = current_state.get("DigitalInput", ())
+
+        relay_mask = 0
+        for idx, item in enumerate(relays):
+            # Values come as strings '0' or '1', some firmware sends numbers
+            if str(item.get("Value")) == "1":
+                relay_mask |= 1 << idx
+
+        digital_input_mask = 0
+        for idx, item in enumerate(digital_inputs):
+            if str(item.get("Value")) == "1":
+                digital_input_mask |= 1 << idx
+
+        return DenkoviSnapshot(
+            relay_count=len(relays),
+            relays=relay_mask,
+            digital_input_count=len(digital_inputs),
+            digital_inputs=digital_input_mask,
+            counters=array("q", [int(item.get("Count", 0)) for item in digital_inputs]),
+            analog_inputs=array(
+                "d",
+                [
+                    _parse_reading(item.get("Measure"))
+                    for item in current_state.get("AnalogInput", ())
+                ],
+            ),
+            analog_outputs=array(
+                "q",
+                [_int_or_zero(item.get("Value")) for item in current_state.get("AnalogOutput", ())],
+            ),
+            temperature_inputs=array(
+                "d",
+                [
+                    _parse_reading(item.get("Value"))
+                    for item in current_state.get("TemperatureInput", ())
+                ],
+            ),
+        )
+    except (AttributeError, OverflowError, TypeError) as err:
+        raise ValueError(f"Unsupported payload: {err!r}") from err
+
+
+def parse_metadata(current_state: dict[str, Any]) -> DenkoviMetadata:
+    """Extract channel names and device information from the CurrentState object."""
+    return DenkoviMetadata(
+        relay_names=tuple(
+            item.get("Name", f"Relay {idx + 1}")
+            for idx, item in enumerate(current_state.get("Relay", []))
+        ),
+        digital_input_names=tuple(
+            item.get("Name", f"DIN{idx + 1}")
+            for idx, item in enumerate(current_state.get("DigitalInput", []))
+        ),
+        analog_input_names=tuple(
+            item.get("Name", f"AIN{idx + 1}")
+            for idx, item in enumerate(current_state.get("AnalogInput", []))
+        ),
+        analog_output_names=tuple(
+            item.get("Name", f"AOUT{idx + 1}")
+            for idx, item in enumerate(current_state.get("AnalogOutput", []))
+        ),
+        temperature_input_names=tuple(
+            item.get("Name", f"TI{idx + 1}")
+            for idx, item in enumerate(current_state.get("TemperatureInput", []))
+        ),
+        device=current_state.get("Device", {}),
+    )
@@ -0,0 +1,107 @@
+"""Versioned device state with optimistic overlays for Denkovi SmartDEN."""
+from __future__ import annotations
+
+import itertools
+import time
+
+from .snapshot import DenkoviSnapshot
+
+
+class DenkoviStateStore:
+    """Hold the state a board reported and the writes not yet confirmed.
+
+    The base snapshot is immutable and only replaced by a newer response.
+    Optimistic writes are overlays per channel (e.g. ("relays", 3)), each
+    with its own version; the coordinator data is the base with the overlays
+    applied. Removing an overlay, after its write was confirmed or failed,
+    brings back exactly the value the board reported.
+
+    Overlays and requests draw versions from one counter. A response carries
+    the version current when its request was sent and is discarded if a
+    response to a later request was already applied.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        self._versions = itertools.count(1)
+        self.version = 0
+        self.base: DenkoviSnapshot | None = None
+        self._base_version = 0
+        # Monotonic time of the last response applied, None for a cached base
+        self.confirmed_at: float | None = None
+        self._overlays: dict[tuple[str, int], tuple[int, int]] = {}
+        self._view: DenkoviSnapshot | None = None
+        self.discarded_responses = 0
+
+    @property
+    def confirmed(self) -> DenkoviSnapshot | None:
+        """Return the state last reported by the board, None if not polled yet."""
+        return None if self.confirmed_at is None else self.base
+
+    @property
+    def overlay_count(self) -> int:
+        """Return the number of channels with a value still being written."""
+        return len(self._overlays)
+
+    @property
+    def view(self) -> DenkoviSnapshot | None:
+        """Return the base snapshot with all overlays applied."""
+        if self._view is None and self.base is not None:
+            view = self.base
+            for (kind, channel_id), (_, value) in self._overlays.items():
+                if kind == "relays":
+                    view = view.with_relay(channel_id, bool(value))
+                else:
+                    view = view.with_analog_output(channel_id, value)
+            self._view = view
+        return self._view
+
+    def restore(self, snapshot: DenkoviSnapshot) -> DenkoviSnapshot:
+        """Use a cached or placeholder snapshot as the base until the board responds."""
+        self.base = snapshot
+        self._view = None
+        return snapshot
+
+    def begin_request(self) -> int:
+        """Return the version to pass to confirm for a request about to be sent."""
+        self.version = next(self._versions)
+        return self.version
+
+    def confirm(self, version: int, snapshot: DenkoviSnapshot) -> bool:
+        """Make a response the new base, return False if it arrived too late."""
+        if version < self._base_version:
+            self.discarded_responses += 1
+            return False
+        self.base = snapshot
+        self._base_version = version
+        self.confirmed_at = time.monotonic()
+        self._view = None
+        return True
+
+    def overlay(self, channel: tuple[str, int], value: int) -> int:
+        """Apply an optimistic value on top of the base, return its version."""
+        self.version = next(self._versions)
+        self._overlays[channel] = (self.version, value)
+        self._view = None
+        return self.version
+
+    def has_overlay(self, channel: tuple[str, int]) -> bool:
+        """Return True if a value for the channel is still being written."""
+        return channel in self._overlays
+
+    def overlay_versions(self, channels: list[tuple[str, int]]) -> dict[tuple[str, int], int]:
+        """Return the current overlay version of each channel."""
+        return {channel: self._overlays[channel][0] for channel in channels}
+
+    def settle(self, versions: dict[tuple[str, int], int]) -> None:
+        """Drop overlays that were written, confirmed or not, unless replaced since."""
+        for channel, version in versions.items():
+            overlay = self._overlays.get(channel)
+            if overlay is not None and overlay[0] == version:
+                del self._overlays[channel]
+                self._view = None
+
+    def clear(self) -> None:
+        """Drop all overlays."""
+        self._overlays = {}
+        self._view = None
@@ -0,0 +1,94 @@
+"""In-memory poll statistics for Denkovi SmartDEN."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+import math
+import time
+
+
+def nearest_rank(values: Iterable[float], percentile: float) -> float | None:
+    """Return the nearest-rank percentile (0-100) of values, None if there are none."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(math.ceil(percentile / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class PollStats:
+    """Ring buffer with the outcome of the most recent polls of one board.
+
+    Memory is bounded by the window size; all values are computed on demand
+    from the buffer, nothing is read back from the recorder.
+    """
+
+    def __init__(self, window: int) -> None:
+        """Initialize the buffers."""
+        # (finished at, round-trip seconds, success) per poll
+        self._polls: deque[tuple[float, float, bool]] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.last_rtt: float | None = None
+        self.last_bytes: int | None = None
+        self.last_parse_time: float | None = None
+
+    def record_success(self, rtt: float, size: int, parse_time: float) -> None:
+        """Record a poll that returned a valid payload."""
+        self._polls.append((time.monotonic(), rtt, True))
+        self.consecutive_failures = 0
+        self.last_rtt = rtt
+        self.last_bytes = size
+        self.last_parse_time = parse_time
+
+    def record_failure(self, elapsed: float) -> None:
+        """Record a poll that failed after elapsed seconds."""
+        self._polls.append((time.monotonic(), elapsed, False))
+        self.consecutive_failures += 1
+
+    def rtt_percentile(self, percentile: float) -> float | None:
+        """Return a percentile (0-100) of the successful round-trip times."""
+        return nearest_rank((rtt for _, rtt, success in self._polls if success), percentile)
+
+    @property
+    def successes(self) -> int:
+        """Return the number of successful polls in the window."""
+        return sum(success for _, _, success in self._polls)
+
+    @property
+    def success_ratio(self) -> float | None:
+        """Return the share of polls in the window that succeeded."""
+        if not self._polls:
+            return None
+        return self.successes / len(self._polls)
+
+    @property
+    def poll_rate(self) -> float | None:
+        """Return the achieved number of polls per second over the window."""
+        if len(self._polls) < 2:
+            return None
+        elapsed = self._polls[-1][0] - self._polls[0][0]
+        if elapsed <= 0:
+            return None
+        return (len(self._polls) - 1) / elapsed
+
+
+@dataclass(slots=True)
+class PayloadRecord:
+    """Raw outcome of one poll, kept for the diagnostics download."""
+
+    time: datetime
+    duration: float
+    body: bytes | None = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class WriteRecord:
+    """Outcome of one batched write request, kept for the diagnostics download."""
+
+    time: datetime
+    duration: float
+    params: str
+    error: str | None = None
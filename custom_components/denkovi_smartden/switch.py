@@ -8,11 +8,11 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN
 from .coordinator import DenkoviDataUpdateCoordinator
+from .entity import DenkoviEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,9 +28,7 @@ async def async_setup_entry(
     # Create switch entities for each relay, excluding those configured as lights
     light_relays = entry.options.get("light_relays", [])
     entities = []
-    relays = coordinator.data.get("relays", {})
-    
-    for relay_id in relays:
+    for relay_id in coordinator.capabilities.relay_ids:
         # relay_id is already an integer (1-8)
         # Skip if this relay is configured as a light
         if relay_id not in light_relays:
@@ -39,7 +37,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class DenkoviSwitch(CoordinatorEntity, SwitchEntity):
+class DenkoviSwitch(DenkoviEntity, SwitchEntity):
     """Representation of a Denkovi SmartDEN switch."""
 
     def __init__(
@@ -51,9 +49,10 @@ class DenkoviSwitch(CoordinatorEntity, SwitchEntity):
         """Initialize the switch."""
         super().__init__(coordinator)
         self._relay_id = relay_id
+        self._channel = ("relays", relay_id)
         self._entry = entry
         # Use name from API, fallback to generic name
-        relay_name = coordinator.data.get("relay_names", {}).get(relay_id, f"Relay {relay_id}")
+        relay_name = coordinator.metadata.relay_name(relay_id, f"Relay {relay_id}")
         self._attr_name = relay_name
         self._attr_unique_id = f"{entry.entry_id}_relay_{relay_id}"
         self._attr_device_info = DeviceInfo(
@@ -61,13 +60,13 @@ class DenkoviSwitch(CoordinatorEntity, SwitchEntity):
             name=f"Denkovi SmartDEN ({coordinator.host})",
             manufacturer="Denkovi",
             model=coordinator.get_device_model(),
-            sw_version=coordinator.data.get("device", {}).get("sysUpTime", "Unknown"),
+            sw_version=coordinator.metadata.device.get("sysUpTime", "Unknown"),
         )
 
     @property
     def is_on(self) -> bool:
         """Return true if switch is on."""
-        return self.coordinator.data.get("relays", {}).get(self._relay_id, False)
+        return self.coordinator.data.relay(self._relay_id)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
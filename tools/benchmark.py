@@ -0,0 +1,256 @@
+"""Benchmarks for the Denkovi SmartDEN poll, parse, write and fan-out paths.
+
+Needs a Home Assistant development environment (homeassistant and aiohttp
+installed). Run from the repository root:
+
+    python tools/benchmark.py                      # print results as JSON
+    python tools/benchmark.py --compare            # fail if slower than the baseline
+    python tools/benchmark.py --update-baseline    # record a new baseline
+
+Every result is the lowest of REPEATS medians in microseconds, lower is better.
+Writes are timed with the write coalescing delay set to 0, so they measure the
+request and parse work only. A result counts as a regression when it exceeds
+the baseline by more than --tolerance.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import json
+from pathlib import Path
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import aiohttp  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.denkovi_smartden.binary_sensor import DenkoviBinarySensor  # noqa: E402
+from custom_components.denkovi_smartden.coordinator import (  # noqa: E402
+    DenkoviDataUpdateCoordinator,
+)
+from custom_components.denkovi_smartden.number import DenkoviAnalogOutputNumber  # noqa: E402
+from custom_components.denkovi_smartden.sensor import (  # noqa: E402
+    DenkoviAnalogSensor,
+    DenkoviCounterSensor,
+    DenkoviTemperatureSensor,
+)
+from custom_components.denkovi_smartden.switch import DenkoviSwitch  # noqa: E402
+from smartden_simulator import (  # noqa: E402
+    IP_MAXI,
+    NOTIFIER,
+    SimulatedBoard,
+    SimulatorServer,
+)
+
+BASELINE = ROOT / "tools" / "benchmark_baseline.json"
+PARSE_ROUNDS = 2000
+NETWORK_ROUNDS = 200
+FANOUT_ROUNDS = 500
+# Runs per result; the best median filters out machine noise
+REPEATS = 5
+
+# Results compared against the baseline, the rest are informational counts
+COMPARED = {"parse_json", "poll", "write_relay", "write_analog_output", "fanout", "fanout_writes_per_update"}
+
+
+class _Entry:
+    """Minimal stand-in for a ConfigEntry, entities only read entry_id and options."""
+
+    entry_id = "benchmark"
+    options: dict[str, Any] = {}
+
+
+def _us(seconds: float) -> float:
+    """Return seconds as microseconds."""
+    return round(seconds * 1_000_000, 1)
+
+
+def _time_sync(func: Callable[[], Any], rounds: int) -> float:
+    """Time a synchronous call, the lowest median of REPEATS runs."""
+    medians = []
+    for _ in range(REPEATS):
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        medians.append(statistics.median(samples))
+    return _us(min(medians))
+
+
+async def _time_async(func: Callable[[], Awaitable[Any]], rounds: int) -> float:
+    """Time an awaitable call, the lowest median of REPEATS runs."""
+    medians = []
+    for _ in range(REPEATS):
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await func()
+            samples.append(time.perf_counter() - started)
+        medians.append(statistics.median(samples))
+    return _us(min(medians))
+
+
+def _build_entities(coordinator: DenkoviDataUpdateCoordinator) -> list[Any]:
+    """Create every entity the platforms would create for the snapshot."""
+    entry = _Entry()
+    data = coordinator.data
+    entities: list[Any] = []
+    entities += [DenkoviSwitch(coordinator, entry, idx) for idx in data.relay_ids]
+    entities += [DenkoviBinarySensor(coordinator, entry, idx) for idx in data.digital_input_ids]
+    entities += [DenkoviCounterSensor(coordinator, entry, idx) for idx in data.digital_input_ids]
+    entities += [
+        DenkoviAnalogSensor(coordinator, entry, idx, idx >= 5) for idx in data.analog_input_ids
+    ]
+    entities += [DenkoviAnalogOutputNumber(coordinator, entry, idx) for idx in data.analog_output_ids]
+    entities += [
+        DenkoviTemperatureSensor(coordinator, entry, idx) for idx in data.temperature_input_ids
+    ]
+    return entities
+
+
+async def _async_bench_board(
+    hass: HomeAssistant, session: aiohttp.ClientSession, model: str
+) -> dict[str, float]:
+    """Run all benchmarks against one simulated board."""
+    board = SimulatedBoard(model=model)
+    server = SimulatorServer(board)
+    port = await server.async_start()
+    coordinator = DenkoviDataUpdateCoordinator(hass, "127.0.0.1", port, board.password, 10, session)
+    results: dict[str, float] = {}
+
+    try:
+        payload = board.current_state()
+        results["parse_json"] = _time_sync(
+            lambda: coordinator._parse_json(payload, coordinator.state.begin_request()),
+            PARSE_ROUNDS,
+        )
+
+        await coordinator.async_refresh()
+        results["poll"] = await _time_async(coordinator.async_refresh, NETWORK_ROUNDS)
+
+        # The fixed coalescing sleep would hide any change in the request work
+        with patch("custom_components.denkovi_smartden.coordinator.WRITE_COALESCE_DELAY", 0):
+            if coordinator.data.relay_count:
+                state = False
+
+                async def toggle_relay() -> None:
+                    nonlocal state
+                    state = not state
+                    await coordinator.async_set_relay(1, state)
+
+                results["write_relay"] = await _time_async(toggle_relay, NETWORK_ROUNDS)
+
+            if coordinator.data.analog_outputs:
+                value = 0
+
+                async def step_output() -> None:
+                    nonlocal value
+                    value = (value + 1) % 1024
+                    await coordinator.async_set_analog_output(1, value)
+
+                results["write_analog_output"] = await _time_async(step_output, NETWORK_ROUNDS)
+
+        # Fan-out: dispatch alternating snapshots where one input changed
+        entities = _build_entities(coordinator)
+        writes = 0
+
+        def count_write() -> None:
+            nonlocal writes
+            writes += 1
+
+        for entity in entities:
+            entity.async_write_ha_state = count_write
+            coordinator.async_add_listener(entity._handle_coordinator_update)
+
+        quiet = coordinator.data
+        board.digital_inputs[0] = 1 - board.digital_inputs[0]
+        active = coordinator._parse_json(board.current_state(), coordinator.state.begin_request())
+        snapshots = [quiet, active]
+
+        def dispatch() -> None:
+            coordinator.data = snapshots[0]
+            snapshots.reverse()
+            coordinator.async_update_listeners()
+
+        dispatch()
+        writes = 0
+        results["fanout"] = _time_sync(dispatch, FANOUT_ROUNDS)
+        results["fanout_writes_per_update"] = round(writes / FANOUT_ROUNDS, 2)
+        results["fanout_entities"] = len(entities)
+
+    finally:
+        await coordinator.async_shutdown()
+        await server.async_stop()
+
+    return {f"{model}.{name}": value for name, value in results.items()}
+
+
+async def async_run_benchmarks() -> dict[str, float]:
+    """Run the benchmarks for every supported model."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        results: dict[str, float] = {}
+        async with aiohttp.ClientSession() as session:
+            for model in (IP_MAXI, NOTIFIER):
+                results.update(await _async_bench_board(hass, session, model))
+        await hass.async_stop(force=True)
+    return results
+
+
+def _compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """Return a description of every result worse than the baseline allows."""
+    regressions = []
+    for name, value in results.items():
+        if name not in baseline or name.rsplit(".", 1)[1] not in COMPARED:
+            continue
+        limit = baseline[name] * (1 + tolerance)
+        if value > limit:
+            regressions.append(f"{name}: {value} us > {limit:.1f} us (baseline {baseline[name]} us)")
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmarks and handle the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--compare", action="store_true", help="exit 1 on a regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": asyncio.run(async_run_benchmarks()),
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(output + "\n")
+        return 0
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        if regressions := _compare(report["results"], baseline, args.tolerance):
+            print("\n".join(["Regressions:", *regressions]), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
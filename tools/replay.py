@@ -0,0 +1,263 @@
+"""Replay Denkovi SmartDEN traffic captured with the "capture traffic" option.
+
+Captures are written per board to <config>/denkovi_smartden/capture_<host>_<port>.jsonl
+(rotated files end in .1, .2). The replay server answers current_state.json
+with the captured responses, including HTTP errors, dropped connections and
+the original response times.
+
+Serve a capture on port 8081 at original speed, or ten times faster:
+
+    python tools/replay.py capture.jsonl
+    python tools/replay.py capture.jsonl.1 capture.jsonl --speed 10
+
+Poll a capture with the coordinator and report poll, parse and fan-out
+timings in microseconds (needs a Home Assistant development environment).
+--speed 0 replays every response back to back without waiting:
+
+    python tools/replay.py capture.jsonl --bench --speed 0
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+from dataclasses import dataclass
+import json
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Any
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from smartden_simulator import SimulatorServer  # noqa: E402
+
+_LOGGER = logging.getLogger(__name__)
+
+POLL_REQUEST = "/current_state.json"
+
+
+@dataclass(slots=True)
+class CapturedResponse:
+    """One captured request/response pair."""
+
+    offset: float
+    duration: float
+    request: str
+    status: int | None
+    body: bytes | None
+    error: str | None = None
+
+
+def load_capture(paths: list[Path]) -> list[CapturedResponse]:
+    """Read capture files and return their records in time order."""
+    raw: list[dict[str, Any]] = []
+    for path in paths:
+        with path.open(encoding="utf-8") as file:
+            raw.extend(json.loads(line) for line in file if line.strip())
+    if not raw:
+        raise ValueError("capture is empty")
+
+    raw.sort(key=lambda record: record["ts"])
+    first = raw[0]["ts"]
+    return [
+        CapturedResponse(
+            offset=record["ts"] - first,
+            duration=record["dur"],
+            request=record["req"],
+            status=record["status"],
+            body=None if record["body"] is None else record["body"].encode(),
+            error=record.get("error"),
+        )
+        for record in raw
+    ]
+
+
+class ReplayServer(SimulatorServer):
+    """Serve captured responses instead of a simulated board.
+
+    With a speed, every request gets the latest response captured at or
+    before the scaled time since the first request. With speed 0 the
+    responses are served in capture order, one per request.
+    """
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self,
+        records: list[CapturedResponse],
+        speed: float = 1.0,
+        replay_latency: bool = True,
+        content_type: str = "application/json",
+    ) -> None:
+        """Initialize the server."""
+        self.records = records
+        self.speed = speed
+        self.replay_latency = replay_latency and speed > 0
+        self.content_type = content_type
+        self.requests = 0
+        self._offsets = [record.offset for record in records]
+        self._started: float | None = None
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+
+    @property
+    def finished(self) -> bool:
+        """Return True once the whole capture has been served."""
+        if self.speed == 0:
+            return self.requests >= len(self.records)
+        if self._started is None:
+            return False
+        return (time.monotonic() - self._started) * self.speed > self._offsets[-1]
+
+    def _next_record(self) -> CapturedResponse:
+        """Return the captured response for the current request."""
+        if self.speed == 0:
+            return self.records[min(self.requests, len(self.records)) - 1]
+        if self._started is None:
+            self._started = time.monotonic()
+        position = (time.monotonic() - self._started) * self.speed
+        return self.records[max(bisect.bisect_right(self._offsets, position) - 1, 0)]
+
+    async def _handle_current_state(self, request: web.Request) -> web.StreamResponse:
+        """Serve the captured response, with its original latency and faults."""
+        self.requests += 1
+        record = self._next_record()
+        if self.replay_latency:
+            await asyncio.sleep(record.duration / self.speed)
+
+        if record.status is None:
+            # Captured as a connection error or timeout
+            if request.transport is not None:
+                request.transport.close()
+            raise asyncio.CancelledError
+        return web.Response(
+            status=record.status,
+            body=record.body or b"",
+            content_type=self.content_type,
+        )
+
+
+async def async_bench(records: list[CapturedResponse], speed: float) -> dict[str, Any]:
+    """Poll the replayed capture with the coordinator and time each stage."""
+    # Imported here so serving a capture works without Home Assistant
+    import aiohttp  # pylint: disable=import-outside-toplevel
+    from benchmark import _build_entities, _median_us  # pylint: disable=import-outside-toplevel
+    from homeassistant.core import HomeAssistant  # pylint: disable=import-outside-toplevel
+
+    from custom_components.denkovi_smartden.coordinator import (  # pylint: disable=import-outside-toplevel
+        DenkoviDataUpdateCoordinator,
+    )
+
+    server = ReplayServer(records, speed)
+    port = await server.async_start()
+    polls = records if speed == 0 else [r for r in records if r.request == POLL_REQUEST]
+
+    rtts: list[float] = []
+    parse_times: list[float] = []
+    fanout_times: list[float] = []
+    writes = 0
+    failures = 0
+
+    def count_write() -> None:
+        nonlocal writes
+        writes += 1
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with aiohttp.ClientSession() as session:
+            coordinator = DenkoviDataUpdateCoordinator(hass, "127.0.0.1", port, "", 10, session)
+            dispatch = coordinator.async_update_listeners
+            entities: list[Any] | None = None
+
+            def timed_dispatch() -> None:
+                started = time.perf_counter()
+                dispatch()
+                fanout_times.append(time.perf_counter() - started)
+
+            coordinator.async_update_listeners = timed_dispatch  # type: ignore[method-assign]
+
+            replay_started = time.monotonic()
+            for record in polls:
+                if speed:
+                    delay = record.offset / speed - (time.monotonic() - replay_started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                await coordinator.async_refresh()
+                if not coordinator.last_update_success:
+                    failures += 1
+                    continue
+                rtts.append(coordinator.stats.last_rtt)
+                parse_times.append(coordinator.stats.last_parse_time)
+
+                if entities is None:
+                    # Attach entities once the first snapshot defines the channels
+                    entities = _build_entities(coordinator)
+                    for entity in entities:
+                        entity.async_write_ha_state = count_write
+                        coordinator.async_add_listener(entity._handle_coordinator_update)
+                    fanout_times.clear()
+                    writes = 0
+
+            await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+    await server.async_stop()
+
+    return {
+        "polls": len(polls),
+        "failures": failures,
+        "poll": _median_us(rtts) if rtts else None,
+        "parse_json": _median_us(parse_times) if parse_times else None,
+        "fanout": _median_us(fanout_times) if fanout_times else None,
+        "fanout_writes_per_update": round(writes / len(fanout_times), 2) if fanout_times else None,
+        "fanout_entities": len(entities or ()),
+    }
+
+
+async def async_serve(records: list[CapturedResponse], args: argparse.Namespace) -> None:
+    """Serve the capture until it has been replayed completely, or forever with --loop."""
+    while True:
+        server = ReplayServer(records, args.speed, not args.no_latency, args.content_type)
+        await server.async_start(args.host, args.port)
+        _LOGGER.info("Replaying %s responses on %s:%s", len(records), args.host, server.port)
+        try:
+            while not server.finished:
+                await asyncio.sleep(0.1)
+        finally:
+            await server.async_stop()
+        _LOGGER.info("Capture replayed, %s requests served", server.requests)
+        if not args.loop:
+            return
+
+
+def main() -> None:
+    """Parse arguments and replay the capture."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path, nargs="+", help="capture files, rotated files included")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale, 0 serves responses back to back")
+    parser.add_argument("--no-latency", action="store_true", help="answer without the captured response time")
+    parser.add_argument("--loop", action="store_true", help="start over at the end of the capture")
+    parser.add_argument("--bench", action="store_true", help="poll the capture and print timings as JSON")
+    parser.add_argument("--content-type", default="application/json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    records = load_capture(args.capture)
+    try:
+        if args.bench:
+            print(json.dumps(asyncio.run(async_bench(records, args.speed)), indent=2))
+        else:
+            asyncio.run(async_serve(records, args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
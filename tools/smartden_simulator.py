@@ -0,0 +1,261 @@
+"""Simulated Denkovi SmartDEN boards for local testing and load generation.
+
+Serves current_state.json the way IP-Maxi and Notifier firmware does: every
+value is a string, unconnected temperature probes read "--- C", and relays and
+analog outputs are written through RelayN= / AnalogOutputN= query parameters.
+Latency, jitter, dropped connections and HTTP errors can be injected.
+
+Run one IP-Maxi on port 8081:
+
+    python tools/smartden_simulator.py
+
+Run 200 boards on ports 9000-9199, half of them Notifiers, with faults:
+
+    python tools/smartden_simulator.py --boards 200 --port 9000 --notifier-ratio 0.5 \\
+        --latency 40 --jitter 20 --drop-rate 0.01 --error-rate 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import json
+import logging
+import random
+import time
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+IP_MAXI = "ip-maxi"
+NOTIFIER = "notifier"
+
+# Channel counts per firmware: relays, digital inputs, analog inputs,
+# analog outputs, temperature inputs
+LAYOUTS: dict[str, tuple[int, int, int, int, int]] = {
+    IP_MAXI: (8, 8, 8, 8, 0),
+    NOTIFIER: (0, 16, 8, 0, 8),
+}
+
+
+@dataclass
+class FaultProfile:
+    """Faults injected into every response of a board."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    drop_rate: float = 0.0
+    error_rate: float = 0.0
+
+    async def async_delay(self) -> None:
+        """Sleep for latency plus a random jitter."""
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class SimulatedBoard:
+    """State of one simulated SmartDEN board."""
+
+    model: str = IP_MAXI
+    password: str = "admin"
+    name: str = "SmartDEN"
+    input_toggle_rate: float = 0.0
+    relays: list[int] = field(default_factory=list)
+    digital_inputs: list[int] = field(default_factory=list)
+    counters: list[int] = field(default_factory=list)
+    analog_inputs: list[float] = field(default_factory=list)
+    analog_outputs: list[int] = field(default_factory=list)
+    temperatures: list[float | None] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        """Create the channels for the model."""
+        relays, digital_inputs, analog_inputs, analog_outputs, temperatures = LAYOUTS[self.model]
+        self.relays = [0] * relays
+        self.digital_inputs = [0] * digital_inputs
+        self.counters = [0] * digital_inputs
+        self.analog_inputs = [round(random.uniform(0, 10), 2) for _ in range(analog_inputs)]
+        self.analog_outputs = [0] * analog_outputs
+        # Every other probe is unconnected and reads "--- C"
+        self.temperatures = [
+            round(random.uniform(18, 24), 1) if idx % 2 == 0 else None
+            for idx in range(temperatures)
+        ]
+
+    def apply_writes(self, query: dict[str, str]) -> None:
+        """Apply RelayN= and AnalogOutputN= parameters."""
+        for key, value in query.items():
+            if key.startswith("Relay") and key[5:].isdigit():
+                idx = int(key[5:]) - 1
+                if 0 <= idx < len(self.relays) and value in ("0", "1"):
+                    self.relays[idx] = int(value)
+            elif key.startswith("AnalogOutput") and key[12:].isdigit():
+                idx = int(key[12:]) - 1
+                if 0 <= idx < len(self.analog_outputs) and value.isdigit():
+                    self.analog_outputs[idx] = min(int(value), 1023)
+
+    def tick(self) -> None:
+        """Randomly change inputs to simulate a live installation."""
+        for idx, value in enumerate(self.digital_inputs):
+            if random.random() < self.input_toggle_rate:
+                self.digital_inputs[idx] = 1 - value
+                if value == 0:
+                    self.counters[idx] += 1
+
+    def current_state(self) -> dict[str, Any]:
+        """Return the current_state.json document."""
+        state: dict[str, Any] = {
+            "Device": {
+                "Name": self.name,
+                "sysUpTime": _format_uptime(time.monotonic() - self.started),
+            },
+        }
+        if self.relays:
+            state["Relay"] = [
+                {"Name": f"Relay {idx + 1}", "Value": str(value)}
+                for idx, value in enumerate(self.relays)
+            ]
+        state["DigitalInput"] = [
+            {"Name": f"DIN{idx + 1}", "Value": str(value), "Count": str(self.counters[idx])}
+            for idx, value in enumerate(self.digital_inputs)
+        ]
+        state["AnalogInput"] = [
+            {"Name": f"AIN{idx + 1}", "Measure": f"{value:.2f} V"}
+            for idx, value in enumerate(self.analog_inputs)
+        ]
+        if self.analog_outputs:
+            state["AnalogOutput"] = [
+                {"Name": f"AOUT{idx + 1}", "Value": str(value)}
+                for idx, value in enumerate(self.analog_outputs)
+            ]
+        if self.temperatures:
+            state["TemperatureInput"] = [
+                {"Name": f"TI{idx + 1}", "Value": "--- C" if value is None else f"{value:.1f} C"}
+                for idx, value in enumerate(self.temperatures)
+            ]
+        return {"CurrentState": state}
+
+
+def _format_uptime(seconds: float) -> str:
+    """Format an uptime the way the firmware does."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours:02}:{minutes:02}:{secs:02}"
+
+
+class SimulatorServer:
+    """HTTP server for one simulated board."""
+
+    def __init__(
+        self,
+        board: SimulatedBoard,
+        faults: FaultProfile | None = None,
+        content_type: str = "application/json",
+    ) -> None:
+        """Initialize the server."""
+        self.board = board
+        self.faults = faults or FaultProfile()
+        self.content_type = content_type
+        self.requests = 0
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving and return the bound port."""
+        app = web.Application()
+        app.router.add_get("/current_state.json", self._handle_current_state)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_current_state(self, request: web.Request) -> web.StreamResponse:
+        """Serve current_state.json, applying writes and injected faults."""
+        self.requests += 1
+        await self.faults.async_delay()
+
+        if random.random() < self.faults.drop_rate:
+            # Close the connection without answering
+            if request.transport is not None:
+                request.transport.close()
+            raise asyncio.CancelledError
+        if random.random() < self.faults.error_rate:
+            return web.Response(status=500, text="Internal Server Error")
+        if request.query.get("pw") != self.board.password:
+            return web.Response(status=401, text="Unauthorized")
+
+        self.board.apply_writes(dict(request.query))
+        self.board.tick()
+        return web.Response(
+            body=json.dumps(self.board.current_state()).encode(),
+            content_type=self.content_type,
+        )
+
+
+async def async_run(args: argparse.Namespace) -> None:
+    """Start the requested boards and serve until interrupted."""
+    faults = FaultProfile(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        drop_rate=args.drop_rate,
+        error_rate=args.error_rate,
+    )
+    servers: list[SimulatorServer] = []
+    for idx in range(args.boards):
+        model = NOTIFIER if random.random() < args.notifier_ratio else IP_MAXI
+        board = SimulatedBoard(
+            model=model,
+            password=args.password,
+            name=f"SmartDEN {idx + 1}",
+            input_toggle_rate=args.toggle_rate,
+        )
+        server = SimulatorServer(board, faults, args.content_type)
+        await server.async_start(args.host, args.port + idx if args.port else 0)
+        servers.append(server)
+        _LOGGER.info("%s listening on %s:%s", model, args.host, server.port)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for server in servers:
+            await server.async_stop()
+
+
+def main() -> None:
+    """Parse arguments and run the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boards", type=int, default=1, help="number of boards")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081, help="port of the first board, 0 for random")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--notifier-ratio", type=float, default=0.0, help="share of boards that are Notifiers")
+    parser.add_argument("--toggle-rate", type=float, default=0.0, help="chance per request that a digital input toggles")
+    parser.add_argument("--latency", type=float, default=0.0, help="response latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random latency jitter in ms")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of connections dropped")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 500 responses")
+    parser.add_argument("--content-type", default="application/json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        asyncio.run(async_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()